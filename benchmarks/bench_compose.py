@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from whatsapp_sender import WhatsAppSender
+from benchmarks.fake_driver import FakeDriver
+
+SAMPLE = "Ødegaard 🔴⚪ signs a new deal at the Emirates, Martínez and Gyökeres next?\n"
+
+def bench_compose(lengths=(140, 280, 1000, 4000), latency=0.002, key_latency=0.001, repeats=3):
+    """Compare typing a message key by key with pasting it in one script call, for several message lengths"""
+    driver = FakeDriver({}, latency=latency, key_latency=key_latency)
+    sender = WhatsAppSender(driver)
+    message_box = driver.whatsapp.message_box
+    print(f"{latency * 1000:.1f}ms per WebDriver call, {key_latency * 1000:.1f}ms per typed character")
+    
+    for length in lengths:
+        message = (SAMPLE * (length // len(SAMPLE) + 1))[:length].strip() + " | https://x.com/arsenal/status/1"
+        results = {}
+        for method in ("type", "paste"):
+            Config.WHATSAPP_COMPOSE_METHOD = method
+            calls_before = sum(driver.calls.values())
+            started = time.perf_counter()
+            for _ in range(repeats):
+                message_box.clear()
+                sender._compose(message_box, message)
+            results[method] = (
+                (time.perf_counter() - started) / repeats,
+                (sum(driver.calls.values()) - calls_before) / repeats,
+                message_box._text == message
+            )
+        
+        print(f"{len(message)} characters: " + ", ".join(
+            f"{method} {seconds * 1000:.0f}ms / {calls:.0f} calls{'' if intact else ' (emoji and accents lost)'}"
+            for method, (seconds, calls, intact) in results.items()
+        ))
+
+if __name__ == "__main__":
+    bench_compose()
\ No newline at end of file
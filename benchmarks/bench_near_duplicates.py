@@ -0,0 +1,60 @@
+import os
+import sys
+import json
+import time
+import random
+import string
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from near_duplicates import NearDuplicateFilter
+
+EVALUATION_SET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "near_duplicates.json")
+
+def evaluate(thresholds=(0.3, 0.35, 0.4, 0.45, 0.5, 0.6)):
+    """Precision and recall of the filter on labelled pairs of tweets from different reporters"""
+    with open(EVALUATION_SET, 'r') as f:
+        pairs = json.load(f)
+    print(f"Evaluation set: {len(pairs)} pairs, {sum(pair['duplicate'] for pair in pairs)} duplicates")
+    
+    for threshold in thresholds:
+        true_positives = false_positives = false_negatives = 0
+        for pair in pairs:
+            duplicates = NearDuplicateFilter(window=3600, threshold=threshold)
+            first = dict(pair['a'], link="https://x.com/a/status/1")
+            second = dict(pair['b'], link="https://x.com/b/status/2")
+            duplicates.check(first, now=1000)
+            flagged = duplicates.check(second, now=1060) is not None
+            
+            true_positives += flagged and pair['duplicate']
+            false_positives += flagged and not pair['duplicate']
+            false_negatives += not flagged and pair['duplicate']
+        
+        precision = true_positives / (true_positives + false_positives) if true_positives + false_positives else 1.0
+        recall = true_positives / (true_positives + false_negatives) if true_positives + false_negatives else 1.0
+        print(f"Threshold {threshold:.2f}: precision {precision:.2f}, recall {recall:.2f}")
+
+def random_tweet(vocabulary):
+    return ' '.join(random.choice(vocabulary) for _ in range(random.randint(12, 35)))
+
+def bench_lookup(window_sizes=(1000, 10000, 100000), lookups=2000):
+    """Average time per check as the number of remembered tweets grows"""
+    vocabulary = [''.join(random.choice(string.ascii_lowercase) for _ in range(random.randint(3, 10)))
+                  for _ in range(20000)]
+    
+    for size in window_sizes:
+        duplicates = NearDuplicateFilter(window=10**9, threshold=0.45)
+        for index in range(size):
+            duplicates.check({'username': f"account_{index % 50}", 'link': str(index), 'text': random_tweet(vocabulary)},
+                             now=1000 + index)
+        
+        tweets = [{'username': "reporter", 'link': str(index), 'text': random_tweet(vocabulary)} for index in range(lookups)]
+        started = time.perf_counter()
+        for tweet in tweets:
+            duplicates.check(tweet, now=1000 + size)
+        elapsed = (time.perf_counter() - started) / lookups
+        print(f"{len(duplicates) - lookups} tweets in the window: {elapsed * 1000:.3f}ms per check")
+
+if __name__ == "__main__":
+    evaluate()
+    bench_lookup()
\ No newline at end of file
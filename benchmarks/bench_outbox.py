@@ -0,0 +1,118 @@
+import os
+import sys
+import time
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from outbox import Outbox
+from bot import TwitterWhatsAppBot
+from twitter_scraper import TwitterScraper
+from whatsapp_sender import WhatsAppSender
+from benchmarks.fake_driver import FakeDriver, FakeTimeline
+from benchmarks.bench_pipeline import virtual_bot_sleeps
+
+def sample_tweets(count):
+    timeline = FakeTimeline("reporter")
+    timeline.post(count, relevant_share=1.0)
+    return [
+        {'id': tweet['link'].split('/')[-1], 'text': tweet['text'], 'link': tweet['link'],
+         'timestamp': tweet['timestamp'], 'username': "reporter", 'scraped_at': time.time()}
+        for tweet in reversed(timeline.tweets)
+    ]
+
+def bench_journal(messages=500, batch_sizes=(1, 10, 50)):
+    """Journal cost per message when pending and sent records are synced once per batch"""
+    tweets = sample_tweets(messages)
+    for batch_size in batch_sizes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            outbox = Outbox(os.path.join(temp_dir, "outbox.jsonl"))
+            started = time.perf_counter()
+            for start in range(0, messages, batch_size):
+                batch = tweets[start:start + batch_size]
+                keys = [outbox.add(tweet) for tweet in batch]
+                outbox.flush()
+                for key in keys:
+                    outbox.record_result(key, True)
+                outbox.flush()
+            elapsed = (time.perf_counter() - started) / messages
+        print(f"Batches of {batch_size}: {elapsed * 1000:.3f}ms of journal writes per message")
+
+class ProcessKilled(BaseException):
+    """Stops the bot wherever it is, skipping its exception handling as a killed process would"""
+
+def crashing_send(sender, sends_left):
+    """Let `sends_left` messages reach the chat, then kill the process before the next one"""
+    send = sender.send
+    
+    def send_or_crash(message, check_chat=False):
+        if sends_left[0] == 0:
+            raise ProcessKilled()
+        sends_left[0] -= 1
+        return send(message, check_chat=check_chat)
+    return send_or_crash
+
+def start_bot(driver):
+    """A bot process on the fake browser, loading its processed store and outbox from disk"""
+    bot = TwitterWhatsAppBot()
+    bot.driver = driver
+    bot.twitter_handle, whatsapp_handle = driver.window_handles
+    bot.twitter_scraper = TwitterScraper(driver)
+    bot.whatsapp_sender = WhatsAppSender(driver)
+    bot.whatsapp_sender.window_handle = whatsapp_handle
+    return bot
+
+def check_crash_replay(accounts=2, tweets=3, crash_after=4):
+    """Kill the bot partway through a cycle's sends, restart it and run a cycle, which scrapes the same tweets again
+    from scratch. Every tweet should reach the chat exactly once"""
+    Config.POLLING_MODE = "profile"
+    # Without pacing each account's tweets go out as soon as they are scraped, so the sends the next account's
+    # journal write confirms are gone from the outbox when the process dies
+    Config.SEND_RATE_PER_MINUTE = 0
+    timelines = {}
+    for index in range(accounts):
+        timeline = FakeTimeline(f"reporter_{index}")
+        timeline.post(5, relevant_share=1.0)
+        timelines[timeline.username] = timeline
+    Config.ACCOUNTS_TO_MONITOR = list(timelines)
+    driver = FakeDriver(timelines, latency=0, key_latency=0)
+    
+    with tempfile.TemporaryDirectory() as temp_dir, open(os.devnull, 'w') as quiet:
+        Config.PROCESSED_TWEETS_STORE = os.path.join(temp_dir, "processed_tweets.bin")
+        Config.PROCESSED_TWEETS_FILE = os.path.join(temp_dir, "processed_tweets.json")
+        Config.SESSION_SNAPSHOT_FILE = os.path.join(temp_dir, "session_snapshot.json")
+        Config.OUTBOX_FILE = os.path.join(temp_dir, "outbox.jsonl")
+        
+        with contextlib.redirect_stdout(quiet), virtual_bot_sleeps():
+            bot = start_bot(driver)
+            bot.run_monitoring_cycle()
+            
+            for timeline in timelines.values():
+                timeline.post(tweets, relevant_share=1.0)
+            new_links = [tweet['link'] for timeline in timelines.values() for tweet in timeline.tweets[:tweets]]
+            
+            # Sends that were confirmed but not journaled yet, and any held back by the rate limit, die with the process
+            bot.whatsapp_sender.send = crashing_send(bot.whatsapp_sender, [crash_after])
+            try:
+                bot.run_monitoring_cycle()
+            except ProcessKilled:
+                pass
+            
+            # As on startup, unconfirmed messages are replayed before the first check
+            restarted = start_bot(driver)
+            replayed = len(restarted.outbox)
+            restarted._dispatch_outbox()
+            restarted.outbox.flush()
+            restarted.run_monitoring_cycle()
+    
+    per_tweet = [sum(link in message for message in driver.whatsapp.sent_messages) for link in new_links]
+    print(f"Crash after {crash_after} of {len(new_links)} sends, then a restart that scrapes again: "
+          f"{replayed} replayed, {per_tweet.count(1)} delivered once, {per_tweet.count(0)} lost, "
+          f"{sum(count > 1 for count in per_tweet)} duplicated, {len(restarted.outbox)} left pending")
+
+if __name__ == "__main__":
+    Config.WHATSAPP_WAIT_TIMEOUTS = {step: 0.5 for step in Config.WHATSAPP_WAIT_TIMEOUTS}
+    bench_journal()
+    check_crash_replay()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from delivery import DeliveryWorker
+from pacing import TokenBucket, MessagePriority
+
+class FakeSender:
+    """Stands in for WhatsAppSender, taking a fixed time per message and recording when each went out"""
+    
+    def __init__(self, send_seconds):
+        self.driver = self
+        self.current_url = "https://web.whatsapp.com"
+        self.send_seconds = send_seconds
+        self.sent = []
+    
+    def send(self, message, check_chat=False):
+        time.sleep(self.send_seconds)
+        self.sent.append((time.monotonic(), message))
+        return True
+
+def tweet(username, text):
+    return {'id': f"{username}-{text}", 'username': username, 'text': text, 'link': f"https://x.com/{username}"}
+
+def build_trace(burst_size):
+    """(seconds after start, tweet): one tweet into a quiet group, then a burst of routine posts
+    with a breaking story arriving just after it"""
+    trace = [(0, tweet("SamiMokbel_BBC", "Arsenal team news ahead of tonight"))]
+    trace += [(60 + index * 0.5, tweet("HandofArsenal", f"Arsenal matchday update {index}")) for index in range(burst_size)]
+    trace.append((64, tweet("David_Ornstein", "Here we go: Arsenal agree a deal")))
+    return trace
+
+def run(trace, burst, priority, speedup, send_seconds):
+    """Feed the trace to a sender worker in real time divided by speedup, returning each tweet's wait and the send times"""
+    sender = FakeSender(send_seconds / speedup)
+    worker = DeliveryWorker(sender, 0, bucket=TokenBucket(Config.SEND_RATE_PER_MINUTE * speedup, burst))
+    with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):
+        worker.start()
+        started = time.monotonic()
+        queued_at = {}
+        for at, message in trace:
+            time.sleep(max(0, started + at / speedup - time.monotonic()))
+            queued_at[message['id']] = time.monotonic()
+            worker.enqueue(message, priority=priority.score(message) if priority else 0)
+        
+        while len(sender.sent) < len(trace):
+            time.sleep(0.01)
+        worker.stop()
+    
+    waits = {message['id']: (sent_at - queued_at[message['id']]) * speedup for sent_at, message in sender.sent}
+    send_times = [(sent_at - started) * speedup for sent_at, _ in sender.sent]
+    return waits, send_times
+
+def busiest_minute(send_times):
+    return max(sum(start <= other < start + 60 for other in send_times) for start in send_times)
+
+def bench_pacing(burst_size=10, speedup=20, send_seconds=1.0):
+    """Compare a fixed delay after every message with the token bucket and priority queue on the same trace"""
+    trace = build_trace(burst_size)
+    priority = MessagePriority(Config.SEND_PRIORITY, Config.URGENT_KEYWORDS, Config.URGENT_KEYWORD_BOOST)
+    idle_id, urgent_id = trace[0][1]['id'], trace[-1][1]['id']
+    # A bucket holding a single token spaces messages like the old fixed delay
+    fixed_interval = 60 / Config.SEND_RATE_PER_MINUTE
+    setups = [
+        (f"One message every {fixed_interval:.0f}s, first come first served", 1, None),
+        (f"Token bucket ({Config.SEND_RATE_PER_MINUTE}/min, burst {Config.SEND_BURST}) and priorities",
+         Config.SEND_BURST, priority),
+    ]
+    
+    print(f"{len(trace)} tweets: one into a quiet group, then {burst_size} routine posts and a breaking story "
+          f"({send_seconds:.1f}s per send, time compressed {speedup}x)")
+    for title, burst, scorer in setups:
+        waits, send_times = run(trace, burst, scorer, speedup, send_seconds)
+        routine = [wait for message_id, wait in waits.items() if message_id.startswith("HandofArsenal")]
+        print(f"{title}:")
+        print(f"   quiet group wait {waits[idle_id]:.1f}s, breaking story wait {waits[urgent_id]:.1f}s, "
+              f"routine wait mean {sum(routine) / len(routine):.1f}s max {max(routine):.1f}s")
+        print(f"   burst drained {send_times[-1] - trace[1][0]:.1f}s after it started, "
+              f"busiest minute {busiest_minute(send_times)} messages")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare send pacing policies on a burst of tweets")
+    parser.add_argument("--burst", type=int, default=10, help="routine tweets in the burst")
+    parser.add_argument("--speedup", type=float, default=20, help="how much faster than real time to run")
+    parser.add_argument("--send-seconds", type=float, default=1.0, help="time WhatsApp takes per message")
+    args = parser.parse_args()
+    bench_pacing(args.burst, args.speedup, args.send_seconds)
\ No newline at end of file
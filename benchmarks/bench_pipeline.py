@@ -0,0 +1,162 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot as bot_module
+from config import Config
+from bot import TwitterWhatsAppBot
+from twitter_scraper import TwitterScraper
+from whatsapp_sender import WhatsAppSender
+from scraper_pool import ScraperPool
+from benchmarks.fake_driver import FakeDriver, FakeTimeline, FIXTURES_DIR, load_fixture
+
+class VirtualSleep:
+    """Stands in for the time module in bot.py, adding up fixed delays instead of sleeping through them"""
+    
+    def __init__(self):
+        self.slept = 0.0
+    
+    def sleep(self, seconds):
+        self.slept += seconds
+    
+    def monotonic(self):
+        # Rate limits see the skipped delays as time that has passed
+        return time.monotonic() + self.slept
+    
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+@contextlib.contextmanager
+def virtual_bot_sleeps():
+    clock = VirtualSleep()
+    bot_module.time = clock
+    try:
+        yield clock
+    finally:
+        bot_module.time = time
+
+def build_timelines(account_count, history, use_fixtures):
+    """Recorded timelines when asked for and available, synthetic ones otherwise"""
+    timelines = {}
+    if use_fixtures and os.path.isdir(FIXTURES_DIR):
+        for filename in sorted(os.listdir(FIXTURES_DIR))[:account_count]:
+            username = filename[:-len(".json")]
+            timelines[username] = FakeTimeline(username, load_fixture(username))
+    
+    for index in range(len(timelines), account_count):
+        timeline = FakeTimeline(f"account_{index}")
+        timeline.post(history)
+        timelines[timeline.username] = timeline
+    return timelines
+
+def check_parity(timelines, latency):
+    """Compare bulk and per-element extraction of every timeline, returning the accounts that differ"""
+    driver = FakeDriver(timelines, latency)
+    scraper = TwitterScraper(driver)
+    mismatched = []
+    for username in timelines:
+        driver.get(f"https://x.com/{username}")
+        bulk = scraper._extract_tweets_bulk()
+        per_element = scraper._extract_tweets_per_element(limit=driver.page_size)
+        if bulk != per_element:
+            mismatched.append(username)
+    return mismatched
+
+def bench_pipeline(accounts=10, tweets=3, cycles=3, latency=0.002, backend="bulk",
+                   pool_size=1, use_fixtures=False, verbose=False, mode="profile"):
+    """Run monitoring cycles against fake browsers, posting `tweets` new tweets per account before each cycle"""
+    Config.EXTRACTION_BACKEND = backend
+    Config.POLLING_MODE = mode
+    timelines = build_timelines(accounts, history=20, use_fixtures=use_fixtures)
+    usernames = list(timelines)
+    Config.ACCOUNTS_TO_MONITOR = usernames
+    drivers = [FakeDriver(timelines, latency)]
+    
+    def driver_factory(user_data_dir, debugging_port=None):
+        drivers.append(FakeDriver(timelines, latency))
+        return drivers[-1]
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        Config.PROCESSED_TWEETS_STORE = os.path.join(temp_dir, "processed_tweets.bin")
+        Config.PROCESSED_TWEETS_FILE = os.path.join(temp_dir, "processed_tweets.json")
+        Config.SESSION_SNAPSHOT_FILE = os.path.join(temp_dir, "session_snapshot.json")
+        Config.OUTBOX_FILE = os.path.join(temp_dir, "outbox.jsonl")
+        
+        output = sys.stdout if verbose else open(os.devnull, 'w')
+        with contextlib.redirect_stdout(output), virtual_bot_sleeps() as clock:
+            bot = TwitterWhatsAppBot()
+            bot.driver = drivers[0]
+            bot.twitter_handle, whatsapp_handle = bot.driver.window_handles
+            bot.twitter_scraper = TwitterScraper(bot.driver)
+            bot.whatsapp_sender = WhatsAppSender(bot.driver)
+            bot.whatsapp_sender.window_handle = whatsapp_handle
+            if pool_size > 1:
+                bot.scraper_pool = ScraperPool(driver_factory, pool_size, [])
+            
+            # The first cycle only records what is already on each profile
+            bot.run_monitoring_cycle(usernames)
+            
+            results = []
+            for _ in range(cycles):
+                for timeline in timelines.values():
+                    timeline.post(tweets)
+                
+                calls_before = sum((driver.calls for driver in drivers), Counter())
+                sent_before = len(bot.driver.whatsapp.sent_messages)
+                slept_before = clock.slept
+                started = time.perf_counter()
+                
+                bot.run_monitoring_cycle(usernames)
+                
+                results.append({
+                    'seconds': time.perf_counter() - started,
+                    'delays': clock.slept - slept_before,
+                    'calls': sum((driver.calls for driver in drivers), Counter()) - calls_before,
+                    'sent': len(bot.driver.whatsapp.sent_messages) - sent_before,
+                })
+            
+            if bot.scraper_pool:
+                bot.scraper_pool.quit()
+    
+    print(f"{len(usernames)} accounts, {tweets} new tweets per account per cycle, {mode} mode, backend {backend}, "
+          f"pool size {pool_size}, {latency * 1000:.1f}ms per WebDriver call")
+    for index, result in enumerate(results, 1):
+        scraped = tweets * len(usernames)
+        print(f"Cycle {index}: {result['seconds']:.2f}s (+{result['delays']:.0f}s fixed delays), "
+              f"{result['calls']['get']} page loads, {sum(result['calls'].values()) / scraped:.1f} WebDriver calls per tweet, "
+              f"{result['sent']} messages sent")
+    
+    seconds = sum(result['seconds'] for result in results)
+    delays = sum(result['delays'] for result in results)
+    sent = sum(result['sent'] for result in results)
+    calls = sum((result['calls'] for result in results), Counter())
+    print(f"Average cycle time: {seconds / cycles:.2f}s, {(seconds + delays) / cycles:.2f}s with fixed delays")
+    print(f"Messages per minute: {sent / seconds * 60:.1f}, {sent / (seconds + delays) * 60:.1f} with fixed delays")
+    print("WebDriver calls: " + ", ".join(f"{name} {count}" for name, count in calls.most_common()))
+    
+    mismatched = check_parity(timelines, latency=0)
+    if mismatched:
+        print(f"⚠️ Bulk and per-element extraction differ for: {', '.join(mismatched)}")
+    else:
+        print("Bulk and per-element extraction agree on every timeline")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark monitoring cycles against fake browsers")
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--tweets", type=int, default=3, help="new tweets per account per cycle")
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=2.0, help="milliseconds per WebDriver call")
+    parser.add_argument("--mode", choices=["profile", "aggregate"], default="profile", help="polling mode")
+    parser.add_argument("--backend", choices=["bulk", "element"], default="bulk")
+    parser.add_argument("--pool", type=int, default=1, help="scraper pool size")
+    parser.add_argument("--fixtures", action="store_true", help="replay timelines saved by benchmarks.record")
+    parser.add_argument("--verbose", action="store_true", help="show the bot's own output")
+    args = parser.parse_args()
+    bench_pipeline(args.accounts, args.tweets, args.cycles, args.latency / 1000, args.backend,
+                   args.pool, args.fixtures, args.verbose, args.mode)
\ No newline at end of file
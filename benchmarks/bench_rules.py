@@ -0,0 +1,66 @@
+import os
+import re
+import sys
+import time
+import random
+import string
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rules import RuleEngine
+
+def legacy_contains_keywords(text, keywords):
+    """The per-keyword regex check the rule engine replaced, kept here for comparison"""
+    text_lower = text.lower()
+    for keyword in keywords:
+        keyword_lower = keyword.lower()
+        if keyword.startswith('#'):
+            pattern = re.escape(keyword_lower) + r'(?=\s|[^\w]|$)'
+        else:
+            pattern = r'\b' + re.escape(keyword_lower) + r'\b'
+        if re.search(pattern, text_lower):
+            return True
+    return False
+
+def random_word(length):
+    return ''.join(random.choice(string.ascii_lowercase) for _ in range(length))
+
+def bench_rules(keyword_count=500, account_count=300, tweet_count=20000):
+    """Compare matches per second of the compiled rule engine with the per-keyword loop"""
+    keywords = [random_word(random.randint(4, 10)) for _ in range(keyword_count)]
+    keywords += [f"#{random_word(random.randint(3, 6))}" for _ in range(keyword_count // 5)]
+    accounts = [f"account_{index}" for index in range(account_count)]
+    account_rules = {
+        username: {"keywords": [random_word(8)], "exclude": [random_word(9)]}
+        for username in accounts[::10]
+    }
+    
+    # Mostly irrelevant tweets, which is the expensive case for the per-keyword loop
+    tweets = []
+    for _ in range(tweet_count):
+        words = [random_word(random.randint(2, 9)) for _ in range(random.randint(10, 40))]
+        if random.random() < 0.1:
+            words.insert(random.randrange(len(words)), random.choice(keywords))
+        tweets.append((random.choice(accounts), ' '.join(words)))
+    
+    started = time.perf_counter()
+    engine = RuleEngine(keywords, [], account_rules)
+    print(f"Compiled {len(keywords)} keywords for {len(account_rules)} account rule sets "
+          f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+    
+    started = time.perf_counter()
+    engine_matches = sum(1 for username, text in tweets if engine.should_include(username, text))
+    engine_rate = len(tweets) / (time.perf_counter() - started)
+    
+    legacy_tweets = tweets[:max(1, tweet_count // 20)]
+    started = time.perf_counter()
+    for _, text in legacy_tweets:
+        legacy_contains_keywords(text, keywords)
+    legacy_rate = len(legacy_tweets) / (time.perf_counter() - started)
+    
+    print(f"Rule engine: {engine_rate:,.0f} tweets/s ({engine_matches} of {len(tweets)} matched)")
+    print(f"Per-keyword regex loop: {legacy_rate:,.0f} tweets/s")
+    print(f"Speedup: {engine_rate / legacy_rate:.1f}x")
+
+if __name__ == "__main__":
+    bench_rules(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,191 @@
+import os
+import sys
+import json
+import time
+import random
+import signal
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from bot import TwitterWhatsAppBot
+from twitter_scraper import TwitterScraper
+from whatsapp_sender import WhatsAppSender
+from sharding import ShardMembership, Spool, shard_owner
+from benchmarks.fake_driver import FakeDriver, FakeTimeline
+from benchmarks.bench_pipeline import virtual_bot_sleeps
+
+class ScheduledTimeline(FakeTimeline):
+    """Timeline whose tweets appear at fixed offsets from a shared start time, so every process sees the same one"""
+    
+    def __init__(self, username, scheduled, started_at):
+        self.username = username
+        self.scheduled = scheduled
+        self.started_at = started_at
+    
+    @property
+    def tweets(self):
+        elapsed = time.time() - self.started_at
+        return [tweet for post_at, tweet in self.scheduled if post_at <= elapsed]
+
+def build_feed(accounts, duration, tweets_per_account, seed):
+    """Each account's tweets with the second they are posted at: some history, then new tweets spread over the run"""
+    random.seed(seed)
+    timelines = [FakeTimeline(f"account_{index}") for index in range(accounts)]
+    feed = {}
+    for timeline in timelines:
+        timeline.post(5)
+        feed[timeline.username] = [(-1, tweet) for tweet in timeline.tweets]
+    
+    # Posted in time order across accounts, so status IDs grow with posting time as on X
+    posts = sorted((random.uniform(1, duration), timeline) for timeline in timelines for _ in range(tweets_per_account))
+    for post_at, timeline in posts:
+        timeline.post(1)
+        feed[timeline.username].insert(0, (post_at, timeline.tweets[0]))
+    return feed
+
+def configure(state_dir):
+    """Point every state file at the run's directory and shrink the timings to fit a short run"""
+    Config.SHARD_DIR = os.path.join(state_dir, "shards")
+    Config.SPOOL_DIR = os.path.join(state_dir, "spool")
+    Config.PROCESSED_TWEETS_STORE = os.path.join(state_dir, "processed_tweets.bin")
+    Config.PROCESSED_TWEETS_FILE = os.path.join(state_dir, "processed_tweets.json")
+    Config.SESSION_SNAPSHOT_FILE = os.path.join(state_dir, "session_snapshot.json")
+    Config.OUTBOX_FILE = os.path.join(state_dir, "outbox.jsonl")
+    Config.METRICS_PORT = None
+    Config.METRICS_FILE = None
+    Config.BROWSER_MEMORY_LIMIT_MB = 0
+    # The fake tweets all read alike, so the near-duplicate filter would drop most of them
+    Config.NEAR_DUPLICATE_WINDOW = 0
+    Config.CHECK_INTERVAL = Config.POLL_MIN_INTERVAL = Config.POLL_MAX_INTERVAL = 1
+    Config.SHARD_HEARTBEAT_INTERVAL = 0.5
+    Config.SHARD_HEARTBEAT_TIMEOUT = 2
+    Config.WHATSAPP_WAIT_TIMEOUTS = {step: 0.5 for step in Config.WHATSAPP_WAIT_TIMEOUTS}
+
+def load_timelines(state_dir):
+    with open(os.path.join(state_dir, "feed.json"), 'r', encoding='utf-8') as f:
+        feed = json.load(f)
+    Config.ACCOUNTS_TO_MONITOR = list(feed['timelines'])
+    return {
+        username: ScheduledTimeline(username, scheduled, feed['started_at'])
+        for username, scheduled in feed['timelines'].items()
+    }
+
+def run_shard(shard_id, state_dir):
+    """Shard process: scrape this shard's accounts from a fake browser until killed"""
+    configure(state_dir)
+    timelines = load_timelines(state_dir)
+    
+    with virtual_bot_sleeps():
+        bot = TwitterWhatsAppBot(shard_id=shard_id)
+        bot.driver = FakeDriver(timelines, latency=0.002, page_load_latency=0.02)
+        bot.twitter_handle = "x"
+        bot.twitter_scraper = TwitterScraper(bot.driver)
+        bot.shard.heartbeat(force=True)
+        
+        while True:
+            wait_seconds = bot.run_shard_tick()
+            sys.stdout.flush()
+            time.sleep(min(wait_seconds, Config.SHARD_HEARTBEAT_INTERVAL))
+
+def bench_sharding(accounts=12, shards=3, duration=12, tweets_per_account=4, seed=7, verbose=False):
+    """Run shard processes against shared fake timelines, kill one halfway and deliver from this process.
+    Every relevant tweet should reach the group exactly once"""
+    with tempfile.TemporaryDirectory() as state_dir:
+        configure(state_dir)
+        started_at = time.time() + 2
+        feed = build_feed(accounts, duration, tweets_per_account, seed)
+        with open(os.path.join(state_dir, "feed.json"), 'w', encoding='utf-8') as f:
+            json.dump({'started_at': started_at, 'timelines': feed}, f)
+        timelines = load_timelines(state_dir)
+        
+        shard_ids = [f"s{index}" for index in range(shards)]
+        logs = {shard_id: open(os.path.join(state_dir, f"{shard_id}.log"), 'w') for shard_id in shard_ids}
+        processes = {
+            shard_id: subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.bench_sharding", "--worker", shard_id, "--dir", state_dir],
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                stdout=logs[shard_id], stderr=subprocess.STDOUT
+            )
+            for shard_id in shard_ids
+        }
+        
+        victim = shard_ids[0]
+        killed_at = None
+        delivered_at = {}
+        output = sys.stdout if verbose else open(os.devnull, 'w')
+        try:
+            with contextlib.redirect_stdout(output), virtual_bot_sleeps():
+                deliverer = TwitterWhatsAppBot()
+                deliverer.spool = Spool(Config.SPOOL_DIR)
+                deliverer.shard_watcher = ShardMembership(Config.SHARD_DIR)
+                whatsapp = FakeDriver({}, latency=0, key_latency=0)
+                deliverer.whatsapp_sender = WhatsAppSender(whatsapp)
+                deliverer.whatsapp_sender.window_handle = "whatsapp"
+                
+                # Run past the last tweet for long enough to detect the dead shard and catch up
+                while time.time() < started_at + duration + Config.SHARD_HEARTBEAT_TIMEOUT + 4:
+                    if killed_at is None and time.time() >= started_at + duration / 2:
+                        processes[victim].send_signal(signal.SIGKILL)
+                        killed_at = time.time()
+                    
+                    sent_before = len(whatsapp.whatsapp.sent_messages)
+                    deliverer.run_delivery_tick()
+                    for message in whatsapp.whatsapp.sent_messages[sent_before:]:
+                        delivered_at.setdefault(message, time.time())
+                    time.sleep(0.2)
+        finally:
+            for process in processes.values():
+                process.kill()
+                process.wait()
+            for log in logs.values():
+                log.close()
+        
+        sent_messages = whatsapp.whatsapp.sent_messages
+    
+    relevant = [
+        (post_at, tweet) for username, scheduled in feed.items() for post_at, tweet in scheduled
+        if Config.RULES.should_include(username, tweet['text']) and not tweet['is_retweet']
+    ]
+    per_tweet = [sum(tweet['link'] in message for message in sent_messages) for _, tweet in relevant]
+    latencies = []
+    orphaned = []
+    for post_at, tweet in relevant:
+        times = [at for message, at in delivered_at.items() if tweet['link'] in message]
+        if not times or post_at < 0:
+            continue
+        latencies.append(times[0] - (started_at + post_at))
+        # Tweets the killed shard was responsible for when it died
+        if started_at + post_at >= killed_at and shard_owner(tweet['author'], shard_ids) == victim:
+            orphaned.append(latencies[-1])
+    
+    print(f"{accounts} accounts over {shards} shard processes, shard {victim} killed after {duration / 2:.0f}s "
+          f"(heartbeat timeout {Config.SHARD_HEARTBEAT_TIMEOUT}s)")
+    print(f"{len(relevant)} relevant tweets: {per_tweet.count(1)} delivered once, {per_tweet.count(0)} lost, "
+          f"{sum(count > 1 for count in per_tweet)} duplicated")
+    if latencies:
+        print(f"Post to delivery: mean {sum(latencies) / len(latencies):.1f}s, max {max(latencies):.1f}s")
+    if orphaned:
+        print(f"Tweets from the killed shard's accounts after it died: {len(orphaned)}, "
+              f"max {max(orphaned):.1f}s post to delivery")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run scraper shards in separate processes against fake browsers")
+    parser.add_argument("--accounts", type=int, default=12)
+    parser.add_argument("--shards", type=int, default=3)
+    parser.add_argument("--duration", type=float, default=12, help="seconds over which new tweets are posted")
+    parser.add_argument("--tweets", type=int, default=4, help="new tweets per account")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="show the delivery process's own output")
+    parser.add_argument("--worker", metavar="ID", help=argparse.SUPPRESS)
+    parser.add_argument("--dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        run_shard(args.worker, args.dir)
+    else:
+        bench_sharding(args.accounts, args.shards, args.duration, args.tweets, args.seed, args.verbose)
\ No newline at end of file
@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tweet_store import ProcessedTweetStore
+
+def bench_store(count=10**6, retention_days=30):
+    """Time load, lookup and save of the processed tweet store with `count` IDs"""
+    # Realistic snowflake-sized status IDs
+    tweet_ids = [str(random.randrange(10**18, 2 * 10**18)) for _ in range(count)]
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "processed_tweets.bin")
+        
+        store = ProcessedTweetStore(path, retention_days)
+        started = time.perf_counter()
+        for tweet_id in tweet_ids:
+            store.add(tweet_id)
+        store.save()
+        print(f"Initial write of {count} IDs: {time.perf_counter() - started:.2f}s "
+              f"({os.path.getsize(path) / 1024 / 1024:.1f} MB on disk)")
+        
+        started = time.perf_counter()
+        store = ProcessedTweetStore(path, retention_days)
+        print(f"Load: {time.perf_counter() - started:.2f}s")
+        
+        sample = random.sample(tweet_ids, 10000) + [str(random.randrange(10**18)) for _ in range(10000)]
+        started = time.perf_counter()
+        hits = sum(1 for tweet_id in sample if tweet_id in store)
+        elapsed = time.perf_counter() - started
+        print(f"Lookup: {elapsed / len(sample) * 1e6:.2f}µs per ID ({hits} hits of {len(sample)})")
+        
+        # A typical cycle adds a handful of new IDs
+        for _ in range(5):
+            store.add(str(random.randrange(2 * 10**18, 3 * 10**18)))
+        started = time.perf_counter()
+        store.save()
+        print(f"Per-cycle save of 5 new IDs: {(time.perf_counter() - started) * 1000:.2f}ms")
+
+if __name__ == "__main__":
+    bench_store(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
@@ -0,0 +1,329 @@
+import os
+import json
+import time
+import random
+from collections import Counter
+from urllib.parse import urlparse
+from datetime import datetime, timezone
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import NoSuchElementException
+
+from config import Config
+from tweet_store import TWITTER_EPOCH_MS
+from twitter_scraper import EXTRACT_TWEETS_SCRIPT, LAST_TWEET_LINK_SCRIPT
+from whatsapp_sender import (
+    PASTE_TEXT_SCRIPT, OPEN_CHAT_TITLE_SCRIPT, RECENT_OUTGOING_SCRIPT, CHAT_LIST_SELECTORS, SEARCH_BOX_SELECTORS,
+    LINK_PREVIEW_SELECTORS, OUTGOING_MESSAGE_SELECTOR, SENT_TICK_SELECTORS
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "timelines")
+
+MESSAGE_BOX_SELECTORS = [
+    (By.XPATH, "//div[@contenteditable='true' and @data-tab='10']"),
+    (By.CSS_SELECTOR, "div[contenteditable='true']"),
+]
+
+def load_fixture(username, fixtures_dir=FIXTURES_DIR):
+    """Timeline recorded by benchmarks.record for an account, or None"""
+    path = os.path.join(fixtures_dir, f"{username}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def status_id(tweet):
+    return int(tweet['link'].split('/')[-1])
+
+class FakeTimeline:
+    """Tweets of one account in the shape readTweet() returns, newest first"""
+    
+    # Shared by all timelines so status IDs grow with posting time across accounts, as on X
+    newest_id = 0
+    
+    def __init__(self, username, tweets=None):
+        self.username = username
+        self.tweets = list(tweets or [])
+        FakeTimeline.newest_id = max([status_id(tweet) for tweet in self.tweets] + [FakeTimeline.newest_id])
+    
+    def post(self, count=1, relevant_share=0.5):
+        """Add new tweets to the top of the timeline, some of them mentioning Arsenal"""
+        for _ in range(count):
+            # Status IDs carry the time they were posted, which the processed tweet store reads
+            now_id = (int(time.time() * 1000) - TWITTER_EPOCH_MS) << 22
+            FakeTimeline.newest_id = max(FakeTimeline.newest_id, now_id) + random.randint(1, 10**6)
+            tweet_id = FakeTimeline.newest_id
+            topic = "Arsenal" if random.random() < relevant_share else "the weather"
+            self.tweets.insert(0, {
+                'text': f"Update {tweet_id} about {topic} from @{self.username}",
+                'link': f"https://x.com/{self.username}/status/{tweet_id}",
+                'author': self.username,
+                'is_retweet': False,
+                'is_pinned': False,
+                'timestamp': datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            })
+
+class FakeElement:
+    """A located element. Every property read and action is one driver round-trip, as in Selenium"""
+    
+    def __init__(self, driver, text="", attributes=None, children=None, on_click=None):
+        self.driver = driver
+        self._text = text
+        self.attributes = attributes or {}
+        self.children = children or {}
+        self.on_click = on_click
+    
+    @property
+    def text(self):
+        self.driver._command("get_text")
+        return self._text
+    
+    def get_attribute(self, name):
+        self.driver._command("get_attribute")
+        return self.attributes.get(name)
+    
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No element matches {value}")
+        return elements[0]
+    
+    def find_elements(self, by, value):
+        self.driver._command("find_elements")
+        return list(self.children.get(value, []))
+    
+    def click(self):
+        self.driver._command("click")
+        if self.on_click:
+            self.on_click(self)
+    
+    def clear(self):
+        self.driver._command("clear")
+        self._text = ""
+    
+    def send_keys(self, *values):
+        self.driver._command("send_keys")
+        # ChromeDriver dispatches a key event for every character
+        self.driver._type_delay(sum(len(value) for value in values))
+        for value in values:
+            self.driver.whatsapp.type(self, value)
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+    
+    def window(self, handle):
+        self.driver._command("switch_to_window")
+        self.driver.current_window_handle = handle
+    
+    @property
+    def active_element(self):
+        self.driver._command("active_element")
+        return self.driver.whatsapp.focused
+
+class FakeWhatsApp:
+    """The parts of WhatsApp Web the sender touches: the chat list and search, the group, the compose box and sent bubbles"""
+    
+    def __init__(self, driver):
+        self.driver = driver
+        self.chat_open = False
+        self.focused = None
+        self.sent_messages = []
+        self.bubbles = []
+        self.message_box = FakeElement(driver, on_click=self._focus)
+        self.search_box = FakeElement(driver, on_click=self._focus)
+        self.chat_item = FakeElement(driver, on_click=self._open_chat)
+        self.group_label = FakeElement(
+            driver, Config.WHATSAPP_GROUP_NAME,
+            children={"./ancestor::div[@role='listitem' or contains(@class, 'chat')]": [self.chat_item]}
+        )
+    
+    def _open_chat(self, element):
+        self.chat_open = True
+    
+    def _focus(self, element):
+        self.focused = element
+    
+    def type(self, element, value):
+        """Apply one send_keys value to the compose box"""
+        if value == Keys.ENTER:
+            self._submit(element)
+        elif value == Keys.SHIFT + Keys.ENTER:
+            element._text += "\n"
+        else:
+            element._text += value
+    
+    def _submit(self, element):
+        """Turn the composed text into an outgoing bubble with a sent tick"""
+        tick = FakeElement(self.driver)
+        bubble = FakeElement(self.driver, element._text, children={selector: [tick] for selector in SENT_TICK_SELECTORS[:1]})
+        self.bubbles.append(bubble)
+        self.sent_messages.append(element._text)
+        element._text = ""
+    
+    def find_elements(self, by, value):
+        """Elements of the WhatsApp page matching a locator"""
+        if value in CHAT_LIST_SELECTORS[:1]:
+            return [FakeElement(self.driver)]
+        if value == f"//span[contains(text(), '{Config.WHATSAPP_GROUP_NAME}')]":
+            return [self.group_label]
+        if value == SEARCH_BOX_SELECTORS[0]:
+            return [self.search_box]
+        if value == f'#pane-side span[title="{Config.WHATSAPP_GROUP_NAME}"]':
+            return [self.chat_item] if self.search_box._text == Config.WHATSAPP_GROUP_NAME else []
+        if (by, value) in MESSAGE_BOX_SELECTORS:
+            return [self.message_box] if self.chat_open else []
+        if value in LINK_PREVIEW_SELECTORS[:1]:
+            return [FakeElement(self.driver)] if "http" in self.message_box._text else []
+        if value == OUTGOING_MESSAGE_SELECTOR:
+            return list(self.bubbles)
+        return []
+
+class FakeDriver:
+    """Stands in for a Chrome WebDriver with X profiles and WhatsApp Web open.
+    Serves timelines from memory, sleeps a simulated latency on every command and counts commands by type"""
+    
+    def __init__(self, timelines, latency=0.002, page_load_latency=0.05, page_size=10, key_latency=0.001):
+        self.timelines = timelines
+        self.latency = latency
+        self.key_latency = key_latency
+        self.page_load_latency = page_load_latency
+        self.page_size = page_size
+        self.calls = Counter()
+        self.current_url = "about:blank"
+        self.window_handles = ["x", "whatsapp"]
+        self.current_window_handle = "x"
+        self.switch_to = FakeSwitchTo(self)
+        self.whatsapp = FakeWhatsApp(self)
+        self.visible = 0
+    
+    def _command(self, name):
+        """Count one WebDriver round-trip and wait out its latency"""
+        self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+    
+    def _type_delay(self, characters):
+        if self.key_latency:
+            time.sleep(self.key_latency * characters)
+    
+    def _timeline_tweets(self):
+        """Tweets shown at the current URL: a monitored profile's, or every timeline's newest first on a search or List"""
+        if "/search?" in self.current_url or "/i/lists/" in self.current_url:
+            tweets = [tweet for timeline in self.timelines.values() for tweet in timeline.tweets]
+            return sorted(tweets, key=status_id, reverse=True)
+        timeline = self.timelines.get(self.current_url.rstrip('/').split('/')[-1])
+        return timeline.tweets if timeline else []
+    
+    def _visible_tweets(self):
+        return self._timeline_tweets()[:self.visible]
+    
+    def get(self, url):
+        self._command("get")
+        time.sleep(self.page_load_latency)
+        self.current_url = url
+        self.visible = self.page_size
+    
+    def execute_script(self, script, *args):
+        self._command("execute_script")
+        
+        if script == EXTRACT_TWEETS_SCRIPT:
+            since_id = int(args[0]) if args and args[0] else None
+            results = []
+            for tweet in self._visible_tweets():
+                result = self._read_tweet(self._tweet_element(tweet))
+                if not result:
+                    continue
+                results.append(result)
+                if (since_id is not None and not result['is_retweet'] and not result['is_pinned']
+                        and status_id(result) <= since_id):
+                    break
+            return results
+        
+        if script == LAST_TWEET_LINK_SCRIPT:
+            tweets = self._visible_tweets()
+            return tweets[-1]['link'] if tweets else None
+        
+        if script == OPEN_CHAT_TITLE_SCRIPT:
+            return Config.WHATSAPP_GROUP_NAME if self.whatsapp.chat_open else None
+        
+        if script == RECENT_OUTGOING_SCRIPT:
+            selector, count = args
+            return [bubble._text for bubble in self.whatsapp.bubbles[-count:]]
+        
+        if script == PASTE_TEXT_SCRIPT:
+            element, text = args
+            element._text = text
+            return text
+        
+        if script.startswith("window.scrollBy"):
+            self.visible += self.page_size
+        return None
+    
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No element matches {value}")
+        return elements[0]
+    
+    def find_elements(self, by, value):
+        self._command("find_elements")
+        if value == '[data-testid="tweet"]':
+            return [self._tweet_element(tweet) for tweet in self._visible_tweets()]
+        return self.whatsapp.find_elements(by, value)
+    
+    def _tweet_element(self, tweet):
+        """Element tree of a rendered tweet, matching the lookups in the per-element extractor.
+        Media-only tweets have no text element"""
+        social_context = []
+        if tweet['is_pinned']:
+            social_context.append(FakeElement(self, "Pinned"))
+        if tweet['is_retweet']:
+            social_context.append(FakeElement(self, f"{tweet['author']} reposted"))
+        
+        children = {
+            'a[href*="/status/"]': [FakeElement(self, attributes={'href': tweet['link']})],
+            '[data-testid="socialContext"]': social_context,
+        }
+        if tweet['text'] is not None:
+            children['[data-testid="tweetText"]'] = [FakeElement(self, tweet['text'])]
+        if tweet['timestamp']:
+            children['time'] = [FakeElement(self, attributes={'datetime': tweet['timestamp']})]
+        return FakeElement(self, children=children)
+    
+    @staticmethod
+    def _read_tweet(element):
+        """What readTweet() in EXTRACT_TWEETS_SCRIPT returns for a rendered tweet, read from the element tree
+        the per-element extractor walks. Inside the page this costs no round-trips"""
+        children = element.children
+        if not children.get('[data-testid="tweetText"]') or not children.get('a[href*="/status/"]'):
+            return None
+        text = children['[data-testid="tweetText"]'][0]._text
+        link = children['a[href*="/status/"]'][0].attributes['href']
+        labels = [indicator._text.lower() for indicator in children.get('[data-testid="socialContext"]', [])]
+        times = children.get('time')
+        return {
+            'text': text,
+            'link': link,
+            'author': urlparse(link).path.split('/')[1],
+            'is_retweet': text.startswith('RT @') or any('retweeted' in label or 'reposted' in label for label in labels),
+            'is_pinned': any('pinned' in label for label in labels),
+            'timestamp': times[0].attributes.get('datetime') if times else None,
+        }
+    
+    def execute_cdp_cmd(self, command, params):
+        self._command("execute_cdp_cmd")
+        return {}
+    
+    def get_cookies(self):
+        self._command("get_cookies")
+        return []
+    
+    def add_cookie(self, cookie):
+        self._command("add_cookie")
+    
+    def save_screenshot(self, path):
+        return True
+    
+    def quit(self):
+        pass
\ No newline at end of file
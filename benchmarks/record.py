@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+from config import Config
+from bot import TwitterWhatsAppBot
+from twitter_scraper import EXTRACT_TWEETS_SCRIPT
+from benchmarks.fake_driver import FIXTURES_DIR
+
+HTML_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "html")
+
+TIMELINE_COLUMN_SCRIPT = """
+const column = document.querySelector('[data-testid="primaryColumn"]');
+return column ? column.outerHTML : null;
+"""
+
+# The timeline column without X's scripts, which would replace it when the page is opened from disk.
+# The base URL resolves links against x.com, and tweet text keeps its line breaks as X's stylesheet does
+HTML_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<base href="https://x.com/">
+<title>{title}</title>
+<style>[data-testid="tweetText"] {{ white-space: pre-wrap; }}</style>
+</head>
+<body>
+{column}
+</body>
+</html>"""
+
+def save_timeline_html(driver, username):
+    """Save the rendered timeline as a page that extraction can be tested against in Chrome"""
+    column = driver.execute_script(TIMELINE_COLUMN_SCRIPT)
+    if not column:
+        print(f"⚠️ No timeline column on @{username}'s page, not saving its HTML")
+        return
+    
+    os.makedirs(HTML_FIXTURES_DIR, exist_ok=True)
+    path = os.path.join(HTML_FIXTURES_DIR, f"{username}.html")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(HTML_PAGE.format(title=f"@{username}", column=column))
+    print(f"💾 Saved @{username}'s timeline page to {path}")
+
+def record_timelines(usernames, scrolls=2, save_html=False):
+    """Log into X in the bot's browser and save each account's rendered timeline as a fixture"""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    bot = TwitterWhatsAppBot()
+    bot.setup_driver()
+    bot.twitter_scraper.login()
+    
+    try:
+        for username in usernames:
+            bot.driver.get(f"https://x.com/{username}")
+            try:
+                WebDriverWait(bot.driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweet"]'))
+                )
+            except TimeoutException:
+                print(f"⚠️ No tweets loaded for @{username}, skipping")
+                continue
+            
+            if save_html:
+                save_timeline_html(bot.driver, username)
+            
+            # Keep page order and drop tweets that stay rendered across scrolls
+            tweets = {}
+            for scroll in range(scrolls + 1):
+                for tweet in bot.driver.execute_script(EXTRACT_TWEETS_SCRIPT, None) or []:
+                    tweets.setdefault(tweet['link'], tweet)
+                if scroll < scrolls and not bot.twitter_scraper._scroll_timeline():
+                    break
+            
+            path = os.path.join(FIXTURES_DIR, f"{username}.json")
+            with open(path, 'w') as f:
+                json.dump(list(tweets.values()), f, indent=2)
+            print(f"💾 Saved {len(tweets)} tweets from @{username} to {path}")
+    finally:
+        bot.driver.quit()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Save monitored accounts' timelines as benchmark and test fixtures")
+    parser.add_argument("usernames", nargs="*", help="accounts to record (default: ACCOUNTS_TO_MONITOR)")
+    parser.add_argument("--html", action="store_true", help="also save each rendered timeline page to tests/fixtures/html")
+    args = parser.parse_args()
+    record_timelines(args.usernames or Config.ACCOUNTS_TO_MONITOR, save_html=args.html)
\ No newline at end of file
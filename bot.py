@@ -1,57 +1,84 @@
 # bot.py
 import time
-import json
-import os
+IMPORTS_STARTED = time.perf_counter()
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
 
 from config import Config
-from twitter_scraper import TwitterScraper
+from chromedriver_cache import resolve_chromedriver
+from twitter_scraper import TwitterScraper, build_search_url
 from whatsapp_sender import WhatsAppSender
+from scraper_pool import ScraperPool
+from delivery import DeliveryWorker
+from tweet_store import ProcessedTweetStore
+from scheduler import PollScheduler
+from timeline_stream import TimelineStream
+from coalescer import TweetCoalescer
+from session_snapshot import SessionSnapshot
+from near_duplicates import NearDuplicateFilter
+from browser_watchdog import BrowserWatchdog
+from outbox import Outbox
+from pacing import TokenBucket, MessagePriority, message_sends
+from sharding import ShardMembership, Spool, shard_path
+from metrics import metrics
+
+# webdriver-manager is only imported when the cached ChromeDriver has to be replaced
+IMPORT_SECONDS = time.perf_counter() - IMPORTS_STARTED
 
 class TwitterWhatsAppBot:
-    def __init__(self):
-        self.processed_tweets = self.load_processed_tweets()
+    def __init__(self, shard_id=None):
+        # A shard only scrapes its share of the accounts and spools tweets for the delivery process,
+        # which owns the shared processed store and outbox. Shards keep their own state files next to them
+        self.shard_id = shard_id
+        self.shard = ShardMembership(Config.SHARD_DIR, shard_id) if shard_id is not None else None
+        self.spool = Spool(Config.SPOOL_DIR) if self.shard else None
+        # Set up by start_delivery, which watches the shards instead of being one
+        self.shard_watcher = None
+        self.live_shards = None
+        self.accounts = list(Config.ACCOUNTS_TO_MONITOR)
+        
+        self.processed_tweets = ProcessedTweetStore(
+            shard_path(Config.PROCESSED_TWEETS_STORE, shard_id),
+            Config.PROCESSED_TWEETS_RETENTION_DAYS,
+            legacy_json_path=None if self.shard else Config.PROCESSED_TWEETS_FILE
+        )
+        self.outbox = Outbox(shard_path(Config.OUTBOX_FILE, shard_id))
+        self.send_bucket = TokenBucket(Config.SEND_RATE_PER_MINUTE, Config.SEND_BURST)
+        self.priority = MessagePriority(Config.SEND_PRIORITY, Config.URGENT_KEYWORDS, Config.URGENT_KEYWORD_BOOST)
         self.driver = None
+        self.twitter_handle = None
         self.twitter_scraper = None
         self.whatsapp_sender = None
-    
-    def load_processed_tweets(self):
-        """Load previously processed tweets to avoid duplicates"""
-        if os.path.exists(Config.PROCESSED_TWEETS_FILE):
-            try:
-                with open(Config.PROCESSED_TWEETS_FILE, 'r') as f:
-                    content = f.read().strip()
-                    if content:  # Check if file has content
-                        return set(json.loads(content))
-                    else:
-                        print("⚠️ processed_tweets.json is empty, starting fresh")
-                        return set()
-            except (json.JSONDecodeError, Exception) as e:
-                print(f"⚠️ Could not load processed_tweets.json: {e}")
-                print("Starting with fresh tweet tracking...")
-                return set()
-        return set()
-    
-    def save_processed_tweets(self):
-        """Save processed tweets to file"""
-        with open(Config.PROCESSED_TWEETS_FILE, 'w') as f:
-            json.dump(list(self.processed_tweets), f)
+        self.scraper_pool = None
+        self.delivery_worker = None
+        self.scheduler = PollScheduler(self.accounts)
+        self.timeline_stream = None
+        self.coalescer = TweetCoalescer(Config.COALESCE_WINDOW, Config.WHATSAPP_MAX_MESSAGE_LENGTH)
+        self.near_duplicates = None
+        if Config.NEAR_DUPLICATE_WINDOW:
+            self.near_duplicates = NearDuplicateFilter(Config.NEAR_DUPLICATE_WINDOW, Config.NEAR_DUPLICATE_THRESHOLD)
+        # Seconds spent in each startup phase, printed once the first page has loaded
+        self.startup_timings = {"imports": IMPORT_SECONDS}
+        self.session_snapshot = SessionSnapshot(shard_path(Config.SESSION_SNAPSHOT_FILE, shard_id))
+        if self.shard and not self.session_snapshot.origins:
+            # A new shard starts from the main snapshot's login but never writes to it
+            self.session_snapshot.origins = SessionSnapshot(Config.SESSION_SNAPSHOT_FILE).origins
+        self.last_session_snapshot = None
+        self.watchdog = BrowserWatchdog(Config.BROWSER_MEMORY_LIMIT_MB)
     
     def setup_driver(self):
         """Initialize Chrome driver"""
         print("🔧 Setting up Chrome driver...")
-        chrome_options = self._setup_chrome_options()
         
         try:
-            print("🔧 Installing/updating ChromeDriver...")
-            service = Service(ChromeDriverManager().install())
-            print("🔧 Starting Chrome with webdriver-manager...")
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            if self.shard:
+                # Shards on one host each need their own profile, and only the main bot uses the debugging port
+                self.driver = self._create_driver(f"{Config.SHARD_PROFILE_DIR}_{self.shard_id}",
+                                                  timings=self.startup_timings)
+            else:
+                self.driver = self._create_driver("./chrome_profile", debugging_port=9222, timings=self.startup_timings)
             print("✅ Chrome driver started successfully")
         except Exception as e:
             print(f"❌ Could not start Chrome: {e}")
@@ -69,17 +96,92 @@ class TwitterWhatsAppBot:
         try:
             current_url = self.driver.current_url
             print(f"✅ Driver working, current URL: {current_url}")
+            # The first tab stays on X; WhatsApp remembers its own tab when it opens one
+            self.twitter_handle = self.driver.current_window_handle
         except Exception as e:
             print(f"❌ Driver not responding: {e}")
             raise
         
         # Initialize scrapers
         print("🔧 Initializing scrapers...")
-        self.twitter_scraper = TwitterScraper(self.driver)
-        self.whatsapp_sender = WhatsAppSender(self.driver)
+        if self.twitter_scraper:
+            # A recovered session keeps each account's since ID and post history
+            self.twitter_scraper.set_driver(self.driver)
+        else:
+            self.twitter_scraper = TwitterScraper(self.driver)
+        if Config.SEND_QUEUE_SIZE == 0 and not self.shard:
+            self.whatsapp_sender = WhatsAppSender(self.driver)
         print("✅ Driver setup complete")
     
-    def _setup_chrome_options(self):
+    def _create_driver(self, user_data_dir, debugging_port=None, timings=None):
+        """Start a Chrome instance with its own profile directory, recording phase durations into timings"""
+        timings = {} if timings is None else timings
+        chrome_options = self._setup_chrome_options(user_data_dir, debugging_port)
+        
+        started = time.perf_counter()
+        service = Service(resolve_chromedriver())
+        timings["driver_resolve"] = time.perf_counter() - started
+        
+        print("🔧 Starting Chrome...")
+        started = time.perf_counter()
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        timings["chrome_launch"] = time.perf_counter() - started
+        return driver
+    
+    def _print_startup_timings(self, title):
+        """Print how long each startup phase took and record it as a metric"""
+        for phase, seconds in self.startup_timings.items():
+            metrics.set_gauge("startup_phase_seconds", seconds, phase=phase)
+        breakdown = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in self.startup_timings.items())
+        print(f"⏱️ {title}: {breakdown}")
+    
+    def setup_scraper_pool(self):
+        """Start extra scraping browsers when a pool size above one is configured"""
+        if Config.SCRAPER_POOL_SIZE <= 1:
+            return
+        
+        # Reuse the X.com login from the main browser so pool workers need no manual login
+        self.driver.switch_to.window(self.twitter_handle)
+        cookies = self.driver.get_cookies()
+        # Shares the main scraper's state, so a cycle that falls back between the combined timeline,
+        # the pool and the main tab never rescans what another path has already seen
+        self.scraper_pool = ScraperPool(self._create_driver, Config.SCRAPER_POOL_SIZE, cookies,
+                                        self.twitter_scraper.account_state)
+    
+    def setup_delivery_worker(self):
+        """Open WhatsApp in a dedicated browser and start the queued sender worker"""
+        self.delivery_worker = DeliveryWorker(
+            self._start_whatsapp_browser(), Config.SEND_QUEUE_SIZE,
+            recover_sender=lambda: self._start_whatsapp_browser(resume=True),
+            watchdog=self.watchdog,
+            outbox=self.outbox,
+            bucket=self.send_bucket
+        )
+        self.delivery_worker.start()
+    
+    def _start_whatsapp_browser(self, resume=False):
+        """Start the sender browser and log into WhatsApp Web, without prompts when resuming a lost session"""
+        if self.whatsapp_sender:
+            try:
+                self.whatsapp_sender.driver.quit()
+            except:
+                pass
+        
+        print("🔧 Starting WhatsApp browser...")
+        driver = self._create_driver(Config.WHATSAPP_PROFILE_DIR)
+        self.whatsapp_sender = WhatsAppSender(driver)
+        # WhatsApp opens in a tab of its own next to the browser's first one
+        if not (resume and self.whatsapp_sender.resume_session(self.session_snapshot, driver.current_window_handle)):
+            self.whatsapp_sender.setup()
+        
+        try:
+            self.session_snapshot.capture(driver)
+            self.session_snapshot.save()
+        except Exception as e:
+            print(f"⚠️ Could not snapshot the WhatsApp session: {e}")
+        return self.whatsapp_sender
+    
+    def _setup_chrome_options(self, user_data_dir="./chrome_profile", debugging_port=None):
         """Set up Chrome options for the webdriver"""
         options = Options()
         
@@ -102,10 +204,15 @@ class TwitterWhatsAppBot:
         options.add_argument("--disable-gpu")
         options.add_argument("--disable-web-security")
         options.add_argument("--disable-features=VizDisplayCompositor")
-        options.add_argument("--remote-debugging-port=9222")
+        if debugging_port:
+            options.add_argument(f"--remote-debugging-port={debugging_port}")
         
         # Profile directory
-        options.add_argument("--user-data-dir=./chrome_profile")
+        options.add_argument(f"--user-data-dir={user_data_dir}")
+        
+        # Record network events so timeline responses can be read without waiting for the page to render
+        if Config.EXTRACTION_BACKEND == "network":
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
         
         return options
     
@@ -117,25 +224,87 @@ class TwitterWhatsAppBot:
         except Exception as e:
             print(f"⚠️ Browser session lost: {str(e)}")
             print("🔄 Attempting to recover session...")
-            
-            try:
-                if self.driver:
-                    self.driver.quit()
-            except:
-                pass
-            
-            # Setup new driver
-            self.setup_driver()
-            
-            # Re-login to services
-            print("🔄 Re-establishing connections...")
-            self.twitter_scraper.login()
-            self.whatsapp_sender.setup()
-            
+            metrics.inc("session_recoveries_total")
+            self._restart_browser("Session recovery")
             return True
     
-    def run_monitoring_cycle(self):
-        """Run one cycle of monitoring all accounts"""
+    def _restart_browser(self, title):
+        """Replace the main browser and log the new one back in without prompts where possible"""
+        recovery_started = time.perf_counter()
+        self.startup_timings = {}
+        
+        try:
+            if self.driver:
+                self.driver.quit()
+        except:
+            pass
+        
+        # Setup new driver
+        self.setup_driver()
+        
+        # Log back in from the profile or the saved snapshot, prompting only if both fail
+        print("🔄 Re-establishing connections...")
+        started = time.perf_counter()
+        if not self.twitter_scraper.resume_session(self.session_snapshot):
+            print("⚠️ Could not restore the X session automatically")
+            self._login_to_twitter()
+        self.startup_timings["x_session"] = time.perf_counter() - started
+        
+        if not self.delivery_worker and self.whatsapp_sender:
+            started = time.perf_counter()
+            if not self.whatsapp_sender.resume_session(self.session_snapshot, self.twitter_handle):
+                print("⚠️ Could not restore the WhatsApp session automatically")
+                self.whatsapp_sender.setup()
+            self.startup_timings["whatsapp_session"] = time.perf_counter() - started
+        
+        recovery_seconds = time.perf_counter() - recovery_started
+        metrics.observe("session_recovery_seconds", recovery_seconds)
+        self.startup_timings["total"] = recovery_seconds
+        self._print_startup_timings(title)
+        self._snapshot_sessions(force=True)
+    
+    def _restart_bloated_browsers(self, idle_seconds=None):
+        """Restart scraping browsers that have outgrown BROWSER_MEMORY_LIMIT_MB. Call only between cycles;
+        idle_seconds is the time until the next scheduled check, if there is a schedule"""
+        if self.scraper_pool:
+            self.scraper_pool.restart_bloated(self.watchdog)
+        
+        # Logging back in takes a while, so leave the main browser alone when a check is due soon
+        if idle_seconds is not None and idle_seconds < Config.BROWSER_RESTART_MIN_IDLE:
+            return
+        if self.watchdog.needs_restart(self.driver, "main"):
+            # Save the freshest cookies for the new browser to log in with
+            self._snapshot_sessions(force=True)
+            self._restart_browser("Browser restart")
+    
+    def _login_to_twitter(self):
+        """Log into X, timing how long the first page took to load"""
+        self.twitter_scraper.login()
+        self.startup_timings["first_page_ready"] = self.twitter_scraper.login_page_seconds
+    
+    def _snapshot_sessions(self, force=False):
+        """Save cookies and local storage of the X and WhatsApp tabs every SESSION_SNAPSHOT_INTERVAL seconds"""
+        recent = (self.last_session_snapshot is not None
+                  and time.monotonic() - self.last_session_snapshot < Config.SESSION_SNAPSHOT_INTERVAL)
+        if recent and not force:
+            return
+        
+        # With queued delivery WhatsApp lives in the worker's browser, which snapshots itself when it logs in
+        handles = [self.twitter_handle]
+        if not self.delivery_worker and self.whatsapp_sender and self.whatsapp_sender.window_handle:
+            handles.append(self.whatsapp_sender.window_handle)
+        try:
+            for handle in handles:
+                self.driver.switch_to.window(handle)
+                self.session_snapshot.capture(self.driver)
+            self.session_snapshot.save()
+            self.last_session_snapshot = time.monotonic()
+        except Exception as e:
+            print(f"⚠️ Could not snapshot browser sessions: {e}")
+    
+    def run_monitoring_cycle(self, accounts=None):
+        """Run one cycle of monitoring the given accounts (all accounts by default)"""
+        accounts = accounts or self.accounts
         print(f"\n🔍 Starting monitoring cycle at {datetime.now().strftime('%H:%M:%S')}")
         
         # Check if session is still valid
@@ -143,29 +312,100 @@ class TwitterWhatsAppBot:
             print("❌ Could not recover browser session")
             return
         
-        for username in Config.ACCOUNTS_TO_MONITOR:
+        cycle_started = time.monotonic()
+        page_loads_before = metrics.total("page_loads_total")
+        
+        scrape_durations = None
+        if Config.POLLING_MODE == "aggregate":
+            scrape_durations = self._run_aggregated_scrape()
+        if scrape_durations is None and self.scraper_pool:
+            scrape_durations = self._run_pool_scrape(accounts)
+        elif scrape_durations is None:
+            scrape_durations = self._run_serial_scrape(accounts)
+        
+        self._flush_coalescer()
+        # Tweets held back by the rate limit, most urgent first
+        self._dispatch_outbox()
+        self._report_cycle_latency(time.monotonic() - cycle_started, scrape_durations,
+                                   metrics.total("page_loads_total") - page_loads_before)
+        
+        # Save delivery results and processed tweets
+        self.outbox.flush()
+        self.processed_tweets.save()
+        self._snapshot_sessions()
+        print(f"✅ Monitoring cycle completed at {datetime.now().strftime('%H:%M:%S')}")
+    
+    def _run_aggregated_scrape(self):
+        """Check every account from one combined timeline on the main Twitter tab.
+        Returns None if it could not be read, so the cycle falls back to loading profiles"""
+        accounts = self.accounts
+        url = Config.AGGREGATE_TIMELINE_URL or build_search_url(accounts)
+        try:
+            self.driver.switch_to.window(self.twitter_handle)
+            scrape_started = time.monotonic()
+            tweets_by_account = self.twitter_scraper.check_aggregated_timeline(url, accounts)
+            elapsed = time.monotonic() - scrape_started
+        except Exception as e:
+            print(f"❌ Error checking the combined timeline: {e}")
+            tweets_by_account = None
+        
+        if tweets_by_account is None:
+            print("⚠️ Combined timeline unavailable, loading each profile instead")
+            metrics.inc("aggregate_fallbacks_total")
+            return None
+        
+        # The combined timeline covers accounts that were not due yet as well
+        for username, new_tweets in tweets_by_account.items():
+            self.scheduler.record_check(username, self.twitter_scraper.last_post_times.get(username))
+            try:
+                self._process_new_tweets(username, new_tweets)
+            except Exception as e:
+                error_msg = str(e)
+                if "invalid session id" in error_msg or "chrome not reachable" in error_msg:
+                    print(f"⚠️ Session lost while sending tweets from @{username}, will recover on next cycle")
+                    break
+                print(f"❌ Error sending tweets from @{username}: {error_msg}")
+        
+        return [elapsed]
+    
+    def _run_pool_scrape(self, accounts):
+        """Check the accounts in parallel on the scraper pool's browsers"""
+        scrape_durations = []
+        for username, new_tweets, elapsed, error in self.scraper_pool.check_accounts(accounts):
+            scrape_durations.append(elapsed)
+            self.scheduler.record_check(username, self.scraper_pool.last_post_times.get(username))
+            if error:
+                print(f"❌ Error checking @{username}: {error}")
+                continue
+            
+            try:
+                self._process_new_tweets(username, new_tweets)
+            except Exception as e:
+                error_msg = str(e)
+                if "invalid session id" in error_msg or "chrome not reachable" in error_msg:
+                    print(f"⚠️ Session lost while sending tweets from @{username}, will recover on next cycle")
+                    break
+                print(f"❌ Error sending tweets from @{username}: {error_msg}")
+        
+        return scrape_durations
+    
+    def _run_serial_scrape(self, accounts):
+        """Check every account one after another on the main Twitter tab"""
+        scrape_durations = []
+        
+        for username in accounts:
+            # Failed checks reschedule with the account's previous post rate
+            post_times = None
             try:
                 # Switch to Twitter tab
-                self.driver.switch_to.window(self.driver.window_handles[0])
+                self.driver.switch_to.window(self.twitter_handle)
                 
+                scrape_started = time.monotonic()
                 new_tweets = self.twitter_scraper.check_account_tweets(username)
+                scrape_durations.append(time.monotonic() - scrape_started)
+                post_times = self.twitter_scraper.last_post_times.get(username)
                 
-                for tweet in new_tweets:
-                    # Check if already processed
-                    if tweet['id'] in self.processed_tweets:
-                        continue
-                    
-                    print(f"📱 Found new tweet from @{username}!")
-                    
-                    # Switch to WhatsApp tab
-                    self.driver.switch_to.window(self.driver.window_handles[-1])
-                    
-                    self.whatsapp_sender.send_tweet(tweet)
-                    self.processed_tweets.add(tweet['id'])
-                    time.sleep(5)  # Delay between messages
-                
-                if not new_tweets:
-                    print(f"✅ No new tweets from @{username}")
+                self._process_new_tweets(username, new_tweets)
                 
                 time.sleep(5)  # Delay between accounts
                 
@@ -173,31 +413,265 @@ class TwitterWhatsAppBot:
                 error_msg = str(e)
                 if "invalid session id" in error_msg or "chrome not reachable" in error_msg:
                     print(f"⚠️ Session lost while checking @{username}, will recover on next cycle")
+                    # Retry this and the remaining accounts once the session is recovered
+                    for pending in accounts[accounts.index(username):]:
+                        self.scheduler.record_check(pending, None)
                     break
                 else:
                     print(f"❌ Error checking @{username}: {error_msg}")
+            
+            self.scheduler.record_check(username, post_times)
         
-        # Save processed tweets
-        self.save_processed_tweets()
-        print(f"✅ Monitoring cycle completed at {datetime.now().strftime('%H:%M:%S')}")
+        return scrape_durations
+    
+    def _process_new_tweets(self, username, new_tweets):
+        """Skip already processed tweets and send the rest to WhatsApp"""
+        if self.shard:
+            self._spool_new_tweets(username, new_tweets)
+            return
+        
+        ready = []
+        for tweet in new_tweets:
+            # Check if already processed, too old for its ID to still be remembered, or held for a digest
+            if (tweet['id'] in self.processed_tweets or self.processed_tweets.predates_retention(tweet['id'])
+                    or self.coalescer.holds(tweet['id'])):
+                continue
+            
+            print(f"📱 Found new tweet from @{username}!")
+            metrics.inc("tweets_new_total", account=username)
+            
+            # Another reporter may already have broken the same story
+            if self.near_duplicates:
+                with metrics.timer("near_duplicate_check"):
+                    duplicate = self.near_duplicates.check(tweet)
+                if duplicate:
+                    earlier, similarity = duplicate
+                    print(f"🔁 Skipping tweet from @{username}: {similarity:.0%} similar to "
+                          f"@{earlier['username']}'s {earlier['link']}")
+                    metrics.inc("tweets_filtered_total", reason="near_duplicate")
+                    self.processed_tweets.add(tweet['id'])
+                    continue
+            
+            # Held tweets count as processed once their digest is in the outbox
+            if self.coalescer.should_coalesce(username):
+                self.coalescer.add(tweet)
+            else:
+                ready.append(tweet)
+        
+        self._deliver(ready)
+        
+        if not new_tweets:
+            print(f"✅ No new tweets from @{username}")
+    
+    def _spool_new_tweets(self, username, new_tweets):
+        """Hand tweets this shard has not handed over before to the delivery process"""
+        fresh = [
+            tweet for tweet in new_tweets
+            if tweet['id'] not in self.processed_tweets and not self.processed_tweets.predates_retention(tweet['id'])
+        ]
+        if fresh:
+            self.spool.put(self.shard_id, username, fresh)
+            for tweet in fresh:
+                self.processed_tweets.add(tweet['id'])
+            print(f"📦 Handed {len(fresh)} tweets from @{username} to the delivery process")
+        else:
+            print(f"✅ No new tweets from @{username}")
+        
+        # Long cycles must not look like a dead shard
+        self.shard.heartbeat()
+    
+    def _deliver(self, messages):
+        """Journal tweets and digests in the outbox, then send whatever is due"""
+        if not messages:
+            return
+        
+        for message in messages:
+            self.outbox.add(message)
+            for tweet in message.get('tweets', [message]):
+                self.processed_tweets.add(tweet['id'])
+        # One synced journal write for the batch, before anything is sent. The IDs are saved too,
+        # or a restart would scrape these tweets again and journal them as new
+        self.outbox.flush()
+        self.processed_tweets.save()
+        # Whatever the rate limit holds back goes out once the cycle's scraping is done
+        self._dispatch_outbox(wait=False)
+    
+    def _dispatch_outbox(self, wait=True):
+        """Send outbox messages that are due, most urgent first, through the sender worker when queued delivery is on.
+        Sending inline without wait stops at the rate limit instead of sleeping through it.
+        Messages that may already have gone out are looked for in the chat before being sent again"""
+        # Sorting is stable, so messages of equal priority keep their outbox order
+        due = sorted(((self.priority.score(entry['message']), entry) for entry in self.outbox.due()),
+                     key=lambda scored: -scored[0])
+        for priority, entry in due:
+            if not self.delivery_worker and not wait and self.send_bucket.wait_time(time.monotonic()) > 0:
+                break
+            if not self.outbox.claim(entry):
+                continue
+            
+            if self.delivery_worker:
+                # Hand off to the sender worker and keep scraping
+                self.delivery_worker.enqueue(entry['message'], key=entry['key'], check_chat=entry['maybe_sent'],
+                                             priority=priority)
+                continue
+            
+            # Paced by the token bucket, so after a quiet spell messages go out without any delay
+            time.sleep(self.send_bucket.wait_time(time.monotonic()))
+            self.send_bucket.take(time.monotonic(), message_sends(entry['message']))
+            metrics.observe("send_queue_wait_seconds", time.time() - max(entry['added_at'], entry['retry_at']),
+                            priority=str(priority))
+            
+            sent = False
+            try:
+                # Switch to WhatsApp tab
+                self.whatsapp_sender.activate()
+                sent = self.whatsapp_sender.send(entry['message'], check_chat=entry['maybe_sent'])
+            finally:
+                self.outbox.record_result(entry['key'], sent)
+    
+    def _flush_coalescer(self):
+        """Send held tweets whose coalescing window has closed"""
+        self._deliver(self.coalescer.pop_ready())
+    
+    def _report_cycle_latency(self, cycle_seconds, scrape_durations, page_loads):
+        """Record the cycle duration and print it next to the estimate for checking accounts one by one"""
+        metrics.observe("cycle_duration_seconds", cycle_seconds)
+        metrics.set_gauge("last_cycle_duration_seconds", cycle_seconds)
+        metrics.set_gauge("last_cycle_page_loads", page_loads)
+        metrics.set_gauge("check_interval_seconds", Config.CHECK_INTERVAL)
+        if cycle_seconds > Config.CHECK_INTERVAL:
+            metrics.inc("cycles_over_interval_total")
+        
+        # The serial path also sleeps 5 seconds after every account
+        serial_estimate = sum(scrape_durations) + 5 * len(scrape_durations)
+        speedup = serial_estimate / cycle_seconds if cycle_seconds else 1.0
+        print(f"⏱️ Cycle took {cycle_seconds:.1f}s for {len(scrape_durations)} timelines in {page_loads} page loads "
+              f"(serial estimate {serial_estimate:.1f}s, speedup {speedup:.1f}x, "
+              f"check interval {Config.CHECK_INTERVAL}s)")
+        if self.delivery_worker:
+            print(f"📬 Send queue depth: {self.delivery_worker.depth()}/{Config.SEND_QUEUE_SIZE}")
+    
+    def start_metrics(self):
+        """Expose metrics over HTTP and flush them to a JSON file in the background"""
+        # Shards would all compete for one port, so only the main bot or delivery process serves HTTP
+        if Config.METRICS_PORT and not self.shard:
+            try:
+                metrics.start_http_server(Config.METRICS_PORT)
+            except OSError as e:
+                print(f"⚠️ Could not start metrics endpoint on port {Config.METRICS_PORT}: {e}")
+        if Config.METRICS_FILE:
+            metrics.start_json_flush(shard_path(Config.METRICS_FILE, self.shard_id), Config.METRICS_FLUSH_INTERVAL)
+    
+    def run_stream_tick(self):
+        """Collect tweets the streaming timeline has picked up and send the relevant ones"""
+        if not self.check_and_recover_session():
+            print("❌ Could not recover browser session")
+            return
+        
+        # A recovered session has a new driver, so the stream has to be reopened
+        tweets = []
+        if not self.timeline_stream or self.timeline_stream.driver is not self.driver:
+            self.timeline_stream = TimelineStream(
+                self.driver, Config.STREAM_TIMELINE_URL or build_search_url(self.accounts), self.twitter_handle
+            )
+            tweets = self.timeline_stream.open()
+        
+        tweets += self.timeline_stream.drain()
+        
+        # Re-arming reports every visible tweet, including ones handled before
+        for username, account_tweets in self.twitter_scraper.new_tweets_by_author(tweets, self.accounts).items():
+            if not account_tweets:
+                continue
+            new_tweets = self.twitter_scraper.select_relevant_tweets(username, account_tweets)
+            if new_tweets:
+                self._process_new_tweets(username, new_tweets)
+        
+        self._flush_coalescer()
+        self._dispatch_outbox()
+        self.outbox.flush()
+        self.processed_tweets.save()
+        self._snapshot_sessions()
+    
+    def _run_stream_loop(self):
+        """Drain the streaming timeline every few seconds instead of reloading profiles"""
+        print(f"\n✅ Setup complete! Streaming timeline, checking every {Config.STREAM_TICK_INTERVAL} seconds...")
+        print("Press Ctrl+C to stop the bot\n")
+        
+        while True:
+            try:
+                self.run_stream_tick()
+                # The stream is reopened on the new browser at the next tick
+                self._restart_bloated_browsers()
+                time.sleep(Config.STREAM_TICK_INTERVAL)
+            
+            except KeyboardInterrupt:
+                print("\n👋 Stopping bot...")
+                break
+            except Exception as e:
+                print(f"❌ Error in streaming tick: {str(e)}")
+                print("⏳ Waiting 60 seconds before retrying...")
+                time.sleep(60)
     
     def start_monitoring(self):
         """Start the main monitoring loop"""
         print("🚀 Starting Arsenal Twitter to WhatsApp Bot...")
+        self.start_metrics()
         
         try:
             self.setup_driver()
-            self.twitter_scraper.login()
-            self.whatsapp_sender.setup()
+            self._login_to_twitter()
+            self._print_startup_timings("Startup")
+            if Config.SEND_QUEUE_SIZE > 0:
+                self.setup_delivery_worker()
+            else:
+                self.whatsapp_sender.setup()
+            self._snapshot_sessions(force=True)
+            
+            # Messages the last run could not confirm go out before anything new
+            if len(self.outbox):
+                print(f"📮 Replaying {len(self.outbox)} unconfirmed messages from the outbox...")
+                self._dispatch_outbox()
+                self.outbox.flush()
+            
+            if Config.POLLING_MODE == "stream":
+                self._run_stream_loop()
+                return
             
-            print(f"\n✅ Setup complete! Starting monitoring every {Config.CHECK_INTERVAL} seconds...")
+            self.setup_scraper_pool()
+            
+            print(f"\n✅ Setup complete! Starting adaptive monitoring "
+                  f"({Config.POLL_MIN_INTERVAL}-{Config.POLL_MAX_INTERVAL} seconds per account)...")
             print("Press Ctrl+C to stop the bot\n")
             
             while True:
                 try:
-                    self.run_monitoring_cycle()
-                    print(f"😴 Waiting {Config.CHECK_INTERVAL} seconds until next check...\n")
-                    time.sleep(Config.CHECK_INTERVAL)
+                    due_accounts = self.scheduler.due_accounts()
+                    if due_accounts:
+                        try:
+                            self.run_monitoring_cycle(due_accounts)
+                        finally:
+                            # Accounts a failed cycle never reached are retried after their usual interval
+                            self.scheduler.reschedule_missing(due_accounts)
+                        print("📅 Polling schedule:")
+                        self.scheduler.report()
+                    
+                    self._flush_coalescer()
+                    self._dispatch_outbox()
+                    self.outbox.flush()
+                    self._restart_bloated_browsers(self.scheduler.seconds_until_next()[0])
+                    
+                    wait_seconds, next_account = self.scheduler.seconds_until_next()
+                    waiting_for = f"next check (@{next_account})"
+                    # Wake up in time to send a held digest
+                    digest_due = self.coalescer.seconds_until_ready()
+                    if digest_due is not None and digest_due < wait_seconds:
+                        wait_seconds, waiting_for = digest_due, "held tweets are sent"
+                    retry_due = self.outbox.seconds_until_due()
+                    if retry_due is not None and retry_due < wait_seconds:
+                        wait_seconds, waiting_for = retry_due, "unconfirmed messages are retried"
+                    if wait_seconds > 0:
+                        print(f"😴 Waiting {wait_seconds:.0f} seconds until {waiting_for}...\n")
+                        time.sleep(wait_seconds)
                     
                 except KeyboardInterrupt:
                     print("\n👋 Stopping bot...")
@@ -208,6 +682,152 @@ class TwitterWhatsAppBot:
                     time.sleep(60)
         
         finally:
+            if self.coalescer.pending:
+                print(f"⚠️ {len(self.coalescer.pending)} tweets held for a digest were not sent, "
+                      f"they are picked up again if still on their timelines after a restart")
+            if self.delivery_worker:
+                self.delivery_worker.stop()
+                self.whatsapp_sender.driver.quit()
+            # Messages still queued stay pending and are replayed on the next start
+            self.outbox.flush()
+            if self.scraper_pool:
+                self.scraper_pool.quit()
             if self.driver:
                 self.driver.quit()
-            print("🛑 Bot stopped.")
\ No newline at end of file
+            print("🛑 Bot stopped.")
+    
+    def _rebalance(self):
+        """Take over exactly the accounts this shard owns among the live shards"""
+        owned = self.shard.owned_accounts(Config.ACCOUNTS_TO_MONITOR)
+        if owned == self.accounts:
+            return
+        
+        gained = [username for username in owned if username not in self.accounts]
+        lost = [username for username in self.accounts if username not in owned]
+        print(f"🧩 Shard {self.shard_id} now checks {len(owned)} of {len(Config.ACCOUNTS_TO_MONITOR)} accounts "
+              f"(+{len(gained)} -{len(lost)}, shards alive: {', '.join(self.shard.live_shards())})")
+        self.accounts = owned
+        self.scheduler.set_accounts(owned)
+        metrics.set_gauge("shard_accounts", len(owned))
+    
+    def run_shard_tick(self):
+        """Refresh this shard's accounts and check the ones that are due. Returns seconds until the next check"""
+        self.shard.heartbeat()
+        self._rebalance()
+        
+        due_accounts = self.scheduler.due_accounts()
+        if due_accounts:
+            try:
+                self.run_monitoring_cycle(due_accounts)
+            finally:
+                self.scheduler.reschedule_missing(due_accounts)
+        
+        self._restart_bloated_browsers(self.scheduler.seconds_until_next()[0])
+        return self.scheduler.seconds_until_next()[0]
+    
+    def start_shard(self):
+        """Check this shard's share of the accounts and hand new tweets to the delivery process"""
+        print(f"🚀 Starting scraper shard {self.shard_id}...")
+        if Config.POLLING_MODE == "stream":
+            print("⚠️ Shards load timelines on a schedule, POLLING_MODE = \"stream\" is ignored")
+        self.start_metrics()
+        
+        try:
+            self.setup_driver()
+            if not self.twitter_scraper.resume_session(self.session_snapshot):
+                self._login_to_twitter()
+            self._print_startup_timings("Startup")
+            self._snapshot_sessions(force=True)
+            # Join before the first rebalance so this shard counts itself among the live ones
+            self.shard.heartbeat(force=True)
+            
+            print(f"\n✅ Shard {self.shard_id} ready! Sharing {len(Config.ACCOUNTS_TO_MONITOR)} accounts "
+                  f"through {Config.SHARD_DIR}, spooling tweets to {Config.SPOOL_DIR}")
+            print("Press Ctrl+C to stop the shard\n")
+            
+            while True:
+                try:
+                    wait_seconds = self.run_shard_tick()
+                    # Wake up for heartbeats and to notice shards joining or leaving
+                    time.sleep(min(wait_seconds, Config.SHARD_HEARTBEAT_INTERVAL))
+                
+                except KeyboardInterrupt:
+                    print("\n👋 Stopping shard...")
+                    break
+                except Exception as e:
+                    print(f"❌ Error in shard cycle: {str(e)}")
+                    print(f"⏳ Waiting {Config.SHARD_HEARTBEAT_INTERVAL} seconds before retrying...")
+                    time.sleep(Config.SHARD_HEARTBEAT_INTERVAL)
+        
+        finally:
+            # The other shards pick up this shard's accounts at their next rebalance
+            self.shard.leave()
+            self.processed_tweets.save()
+            if self.driver:
+                self.driver.quit()
+            print("🛑 Shard stopped.")
+    
+    def run_delivery_tick(self):
+        """Deliver the tweets shards have spooled, removing each batch once it is safely recorded"""
+        batches = self.spool.batches()
+        for path, batch in batches:
+            self._process_new_tweets(batch['username'], batch['tweets'])
+        
+        self._flush_coalescer()
+        self._dispatch_outbox()
+        self.outbox.flush()
+        self.processed_tweets.save()
+        
+        # Tweets held for a digest only live in memory, so their batches stay until the digest is in the outbox
+        for path, batch in batches:
+            if not any(self.coalescer.holds(tweet['id']) for tweet in batch['tweets']):
+                self.spool.remove(path)
+        
+        live = self.shard_watcher.live_shards()
+        if live != self.live_shards:
+            print(f"🧩 Shards alive: {', '.join(live) or 'none'}")
+            self.live_shards = live
+        metrics.set_gauge("live_shards", len(live))
+    
+    def start_delivery(self):
+        """Send the tweets scraper shards spool, from one WhatsApp browser"""
+        print("🚀 Starting delivery process for scraper shards...")
+        self.start_metrics()
+        self.spool = Spool(Config.SPOOL_DIR)
+        self.shard_watcher = ShardMembership(Config.SHARD_DIR)
+        self.live_shards = None
+        
+        try:
+            # Sends go through the worker so a lost WhatsApp session is recovered without prompts
+            self.setup_delivery_worker()
+            
+            if len(self.outbox):
+                print(f"📮 Replaying {len(self.outbox)} unconfirmed messages from the outbox...")
+                self._dispatch_outbox()
+                self.outbox.flush()
+            
+            print(f"\n✅ Setup complete! Delivering tweets spooled in {Config.SPOOL_DIR}")
+            print("Press Ctrl+C to stop the delivery process\n")
+            
+            while True:
+                try:
+                    self.run_delivery_tick()
+                    time.sleep(Config.SPOOL_POLL_INTERVAL)
+                
+                except KeyboardInterrupt:
+                    print("\n👋 Stopping delivery process...")
+                    break
+                except Exception as e:
+                    print(f"❌ Error delivering spooled tweets: {str(e)}")
+                    print("⏳ Waiting 60 seconds before retrying...")
+                    time.sleep(60)
+        
+        finally:
+            if self.coalescer.pending:
+                print(f"⚠️ {len(self.coalescer.pending)} tweets held for a digest were not sent, "
+                      f"their spool files are delivered after a restart")
+            if self.delivery_worker:
+                self.delivery_worker.stop()
+                self.whatsapp_sender.driver.quit()
+            self.outbox.flush()
+            print("🛑 Delivery process stopped.")
\ No newline at end of file
@@ -0,0 +1,51 @@
+from metrics import metrics
+
+class BrowserWatchdog:
+    """Samples the resident memory of each Chrome instance's processes and decides when one should be restarted"""
+    
+    def __init__(self, limit_mb):
+        self.limit_mb = limit_mb
+        self.psutil = None
+        
+        # psutil is optional; without it browsers are only restarted when they crash
+        if limit_mb:
+            try:
+                import psutil
+                self.psutil = psutil
+            except ImportError:
+                print("⚠️ psutil is not installed, browser memory will not be watched (pip install psutil)")
+    
+    def rss(self, driver):
+        """Resident memory in bytes of every process under the driver's chromedriver, or None if unavailable"""
+        service = getattr(driver, "service", None)
+        process = getattr(service, "process", None)
+        if not self.psutil or not process:
+            return None
+        
+        try:
+            children = self.psutil.Process(process.pid).children(recursive=True)
+        except self.psutil.Error:
+            return None
+        
+        total = 0
+        for child in children:
+            # Renderers come and go between listing and reading them
+            try:
+                total += child.memory_info().rss
+            except self.psutil.Error:
+                pass
+        return total
+    
+    def needs_restart(self, driver, browser):
+        """Record the browser's memory and check whether it has grown past the limit"""
+        rss = self.rss(driver)
+        if rss is None:
+            return False
+        
+        metrics.set_gauge("browser_rss_bytes", rss, browser=browser)
+        if rss < self.limit_mb * 1024 * 1024:
+            return False
+        
+        print(f"🧹 {browser} browser is using {rss / 2**20:.0f}MB (limit {self.limit_mb}MB), restarting it...")
+        metrics.inc("browser_restarts_total", browser=browser)
+        return True
\ No newline at end of file
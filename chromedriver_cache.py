@@ -0,0 +1,102 @@
+import os
+import re
+import sys
+import json
+import shutil
+import subprocess
+from config import Config
+
+VERSION_PATTERN = re.compile(r"(\d+)\.\d+\.\d+\.\d+")
+
+# Looked up on PATH when CHROME_PATH does not exist
+CHROME_COMMANDS = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"]
+
+# Resolved once per process, so session recovery and extra browsers skip the lookup entirely
+_resolved_path = None
+
+def _version_from_output(command):
+    """Run `command --version` and pull the dotted version out of its output"""
+    try:
+        output = subprocess.run(command + ["--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output)
+    return match.group(0) if match else None
+
+def local_chrome_version():
+    """Version of the installed Chrome, or None if it cannot be found"""
+    if sys.platform == "win32":
+        # chrome.exe --version opens a window on Windows, so ask the registry instead
+        try:
+            output = subprocess.run(
+                ["reg", "query", r"HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon", "/v", "version"],
+                capture_output=True, text=True, timeout=10
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            return None
+        match = VERSION_PATTERN.search(output)
+        return match.group(0) if match else None
+    
+    candidates = [Config.CHROME_PATH] if os.path.exists(Config.CHROME_PATH) else []
+    candidates += [shutil.which(command) for command in CHROME_COMMANDS if shutil.which(command)]
+    for candidate in candidates:
+        version = _version_from_output([candidate])
+        if version:
+            return version
+    return None
+
+def _major(version):
+    return version.split('.')[0] if version else None
+
+def _load_cache():
+    try:
+        with open(Config.CHROMEDRIVER_CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+def _save_cache(path, chrome_version):
+    try:
+        with open(Config.CHROMEDRIVER_CACHE_FILE, 'w') as f:
+            json.dump({
+                'path': path,
+                'driver_version': _version_from_output([path]),
+                'chrome_version': chrome_version
+            }, f)
+    except OSError as e:
+        print(f"⚠️ Could not cache the ChromeDriver path: {e}")
+
+def resolve_chromedriver():
+    """Path to a ChromeDriver matching the local Chrome. Only asks webdriver-manager when the cached one is missing or stale"""
+    global _resolved_path
+    if _resolved_path and os.path.exists(_resolved_path):
+        return _resolved_path
+    
+    chrome_version = local_chrome_version()
+    cached = _load_cache()
+    usable = cached and os.path.exists(cached.get('path', ''))
+    
+    # Without a detectable Chrome there is nothing to compare against, so trust the cached driver
+    if usable and (chrome_version is None or _major(cached.get('driver_version')) == _major(chrome_version)):
+        print(f"✅ Using cached ChromeDriver {cached.get('driver_version') or ''} at {cached['path']}")
+        _resolved_path = cached['path']
+        return _resolved_path
+    
+    if usable:
+        print(f"🔄 Chrome is now {chrome_version}, cached ChromeDriver is {cached.get('driver_version')}")
+    
+    print("🔧 Installing/updating ChromeDriver...")
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager().install()
+    except Exception as e:
+        if not usable:
+            raise
+        # Offline: an older driver may still work, and failing outright certainly won't
+        print(f"⚠️ Could not update ChromeDriver ({e}), trying the cached one")
+        _resolved_path = cached['path']
+        return _resolved_path
+    
+    _save_cache(path, chrome_version)
+    _resolved_path = path
+    return _resolved_path
\ No newline at end of file
@@ -0,0 +1,81 @@
+import time
+from config import Config
+
+class TweetCoalescer:
+    """Holds tweets from coalescing accounts briefly so a burst goes out as one digest message"""
+    
+    def __init__(self, window, max_length):
+        self.window = window
+        self.max_length = max_length
+        self.pending = []
+        self.batch_started = None
+    
+    def should_coalesce(self, username):
+        """Check whether an account's tweets are held for digests"""
+        return self.window > 0 and username in Config.COALESCE_ACCOUNTS
+    
+    def add(self, tweet):
+        """Hold a tweet until its batch's window closes"""
+        if not self.pending:
+            self.batch_started = time.time()
+        self.pending.append(tweet)
+        print(f"🧺 Holding tweet from @{tweet['username']} for a digest ({len(self.pending)} pending)")
+    
+    def holds(self, tweet_id):
+        """Check whether a tweet is waiting in the pending batch"""
+        return any(tweet['id'] == tweet_id for tweet in self.pending)
+    
+    def seconds_until_ready(self, now=None):
+        """Seconds until the pending batch is due, or None if nothing is pending"""
+        if not self.pending:
+            return None
+        return max(0, self.batch_started + self.window - (now or time.time()))
+    
+    def pop_ready(self, now=None, force=False):
+        """Return the pending batch as messages once its window has closed: the tweet itself
+        if it arrived alone, otherwise a digest"""
+        remaining = self.seconds_until_ready(now)
+        if remaining is None or (remaining > 0 and not force):
+            return []
+        
+        tweets, self.pending = self.pending, []
+        if len(tweets) == 1:
+            return tweets
+        
+        print(f"🧺 Coalescing {len(tweets)} tweets into one digest")
+        return [self._build_digest(tweets)]
+    
+    def _build_digest(self, tweets):
+        """One line per tweet, split into parts that fit WhatsApp's message length limit.
+        Each part keeps the links of its tweets, which the sender looks for in the chat"""
+        header = f"{len(tweets)} new tweets"
+        
+        parts = [[header]]
+        part_links = [[]]
+        part_length = len(Config.MESSAGE_PREFIX) + len(header)
+        for tweet in tweets:
+            # Lines are joined with one line break each
+            line = self._digest_line(tweet, self.max_length - len(Config.MESSAGE_PREFIX) - 1)
+            if part_length + 1 + len(line) > self.max_length and part_links[-1]:
+                parts.append([])
+                part_links.append([])
+                part_length = len(Config.MESSAGE_PREFIX)
+            line = self._digest_line(tweet, self.max_length - part_length - 1)
+            parts[-1].append(line)
+            part_links[-1].append(tweet['link'])
+            part_length += 1 + len(line)
+        
+        return {
+            'username': ", ".join(dict.fromkeys(tweet['username'] for tweet in tweets)),
+            'tweets': tweets,
+            'parts': parts,
+            'part_links': part_links,
+            'link': tweets[-1]['link'],
+            'scraped_at': min(tweet.get('scraped_at', time.time()) for tweet in tweets)
+        }
+    
+    def _digest_line(self, tweet, room):
+        """A tweet's digest line, cut down to room characters by shortening the text and never the link"""
+        link = f" | {tweet['link']}"
+        line = f"@{tweet['username']}: {tweet['text']}"
+        return line[:max(room - len(link), 0)] + link
\ No newline at end of file
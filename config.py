@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from rules import RuleEngine
 
 load_dotenv()
 
@@ -19,15 +20,112 @@ class Config:
         "Emirates"
     ]
     
+    # Tweets containing any of these are never forwarded (same matching rules as KEYWORDS)
+    EXCLUDE_KEYWORDS = []
+    
+    # Per-account rules: "include_all" forwards every original tweet, "keywords" and "exclude"
+    # extend the global lists for that account
+    ACCOUNT_RULES = {
+        "HandofArsenal": {"include_all": True},
+    }
+    
     # WhatsApp settings
     WHATSAPP_GROUP_NAME = "Arteta FC"
     
     # Bot settings
-    CHECK_INTERVAL = 120  # seconds
-    PROCESSED_TWEETS_FILE = "processed_tweets.json"
+    CHECK_INTERVAL = 120  # seconds, starting interval for each account
+    
+    # Adaptive polling: each account's interval follows its recent post rate within these bounds
+    POLL_MIN_INTERVAL = 30  # seconds
+    POLL_MAX_INTERVAL = 900  # seconds
+    POLL_TARGET_POSTS_PER_CHECK = 0.5  # aim for roughly one new post every other check
+    POLL_RATE_WINDOW_HOURS = 24
+    POLL_RATE_SMOOTHING = 0.3  # weight of the latest check in the smoothed post rate
+    POLL_JITTER = 0.1  # +/- fraction added to each interval
+    
+    # Local-time windows when every interval is tightened, e.g. transfer deadline day
+    HIGH_ACTIVITY_WINDOWS = [
+        # ("2026-09-01T00:00", "2026-09-01T23:59"),
+    ]
+    HIGH_ACTIVITY_INTERVAL_FACTOR = 0.25
+    PROCESSED_TWEETS_FILE = "processed_tweets.json"  # legacy format, migrated on first start
+    PROCESSED_TWEETS_STORE = "processed_tweets.bin"
+    PROCESSED_TWEETS_RETENTION_DAYS = 30
+    
+    # Tweet extraction: "bulk" reads the whole page in one script call, "element" uses per-field lookups,
+    # "network" reads the timeline GraphQL responses from Chrome's performance log (falls back to "bulk")
+    EXTRACTION_BACKEND = "bulk"
+    NETWORK_TIMELINE_ENDPOINTS = ["UserTweets"]
+    NETWORK_CAPTURE_TIMEOUT = 10  # seconds
+    
+    # "profile" loads each account's profile on its schedule, "aggregate" loads one timeline combining every
+    # account whenever any of them is due (profiles are loaded if it fails), "stream" keeps one live timeline open
+    POLLING_MODE = "profile"
+    AGGREGATE_TIMELINE_URL = None  # e.g. an X List URL; defaults to a live search for from: every account
+    AGGREGATE_INDEX_LAG = 300  # seconds; the combined timeline is read back this far past the newest tweet seen on it
+    STREAM_TIMELINE_URL = None  # e.g. an X List URL; defaults to a live search for from: every account
+    STREAM_TICK_INTERVAL = 5  # seconds between buffer drains
+    STREAM_STALE_AFTER = 600  # reload the timeline after this many seconds without page updates
+    
+    # Scroll at most this many times when every visible tweet on a profile is new
+    CATCHUP_MAX_SCROLLS = 5
+    RECENT_POSTS_PER_ACCOUNT = 20
+    
+    # Number of browsers scraping accounts in parallel (1 = check accounts one by one on the main tab)
+    SCRAPER_POOL_SIZE = 1
+    SCRAPER_POOL_PROFILE_DIR = "./chrome_profile_pool"
+    
+    # Tweets waiting for WhatsApp delivery (0 = send inline from the scraping loop)
+    SEND_QUEUE_SIZE = 0
+    WHATSAPP_PROFILE_DIR = "./chrome_profile_whatsapp"
+    
+    # Journal of messages on their way to WhatsApp; unconfirmed ones are retried and replayed after a restart
+    OUTBOX_FILE = "outbox.jsonl"
+    OUTBOX_RETRY_BASE = 30  # seconds before the first retry, doubling after each failure
+    OUTBOX_RETRY_MAX_DELAY = 900  # seconds
+    OUTBOX_MAX_ATTEMPTS = 6
+    
+    # Send pacing: a token bucket refilled at SEND_RATE_PER_MINUTE lets up to SEND_BURST messages go out
+    # back to back after a quiet spell, then spaces them at the refill rate (0 = no pacing)
+    SEND_RATE_PER_MINUTE = 12
+    SEND_BURST = 3
+    # Waiting messages go out highest priority first: the account's priority (0 if not listed), plus
+    # URGENT_KEYWORD_BOOST if the tweet has an urgent phrase (same matching rules as KEYWORDS)
+    SEND_PRIORITY = {
+        "David_Ornstein": 10,
+        "SamiMokbel_BBC": 5,
+    }
+    URGENT_KEYWORDS = ["Here we go", "Breaking", "Official", "Confirmed", "Done deal"]
+    URGENT_KEYWORD_BOOST = 20
+    
+    # Sharding: run "python main.py --shard ID" once per scraper process and "python main.py --deliver" once.
+    # Shards split the accounts between them and hand new tweets to the delivery process through the spool.
+    # Point both directories at shared storage to run shards on several machines
+    SHARD_DIR = "./shards"
+    SPOOL_DIR = "./spool"
+    SHARD_PROFILE_DIR = "./chrome_profile_shard"
+    SHARD_HEARTBEAT_INTERVAL = 15  # seconds
+    SHARD_HEARTBEAT_TIMEOUT = 90  # seconds without a heartbeat before a shard's accounts move to the others
+    SPOOL_POLL_INTERVAL = 2  # seconds between looks at the spool in the delivery process
     
     # Chrome settings
     CHROME_PATH = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+    # Resolved ChromeDriver path and versions, reused until Chrome's major version changes
+    CHROMEDRIVER_CACHE_FILE = "chromedriver_cache.json"
+    
+    # Cookies and local storage of X and WhatsApp Web, used to log a recovered browser back in without prompts
+    SESSION_SNAPSHOT_FILE = "session_snapshot.json"
+    SESSION_SNAPSHOT_INTERVAL = 1800  # seconds between snapshots while running
+    SESSION_RESTORE_TIMEOUT = 20  # seconds to wait for a logged-in page after restoring
+    
+    # URL patterns X tabs never load: images, video and fonts the scraper doesn't read ([] = load everything).
+    # Only X tabs are affected, so WhatsApp link previews still show their images
+    BLOCKED_URL_PATTERNS = [
+        "*pbs.twimg.com/*", "*video.twimg.com/*", "*.mp4*", "*.m3u8*", "*.woff2*", "*.woff*", "*.ttf*"
+    ]
+    # Restart a browser between cycles once its processes use more than this many MB (0 = never, needs psutil)
+    BROWSER_MEMORY_LIMIT_MB = 1500
+    BROWSER_RESTART_MIN_IDLE = 30  # seconds; the main browser is only restarted when no check is due sooner
     
     # URLs
     TWITTER_URL = "https://twitter.com"
@@ -36,5 +134,38 @@ class Config:
     # Timeouts
     WHATSAPP_LOAD_TIMEOUT = 30
     
+    # Longest wait for each WhatsApp readiness signal before falling back (seconds)
+    WHATSAPP_WAIT_TIMEOUTS = {
+        "ready": 10,         # chat list visible
+        "chat_open": 5,      # chat header shows WHATSAPP_GROUP_NAME
+        "search": 5,         # search results list the group
+        "focus": 2,          # message box focused
+        "link_preview": 5,   # preview card in the compose area
+        "sent": 15,          # outgoing bubble shows a sent or delivered tick
+    }
+    
+    # Metrics: Prometheus text at http://127.0.0.1:METRICS_PORT/metrics (None = off)
+    # and a JSON snapshot rewritten every METRICS_FLUSH_INTERVAL seconds (None = off)
+    METRICS_PORT = 9108
+    METRICS_FILE = "metrics.json"
+    METRICS_FLUSH_INTERVAL = 60
+    
     # Message settings
-    MESSAGE_PREFIX = "*AUTOMATED*: "
\ No newline at end of file
+    MESSAGE_PREFIX = "*AUTOMATED*: "
+    # "paste" inserts each message in one script call and keeps emoji, accents and line breaks;
+    # "type" sends one key event per character and strips everything ChromeDriver cannot type
+    WHATSAPP_COMPOSE_METHOD = "paste"
+    WHATSAPP_MAX_MESSAGE_LENGTH = 65536
+    
+    # Near-duplicate suppression: a tweet is dropped if another account's tweet sharing at least
+    # NEAR_DUPLICATE_THRESHOLD of its words was forwarded in the last NEAR_DUPLICATE_WINDOW seconds (0 = off, 3600 = one hour)
+    NEAR_DUPLICATE_WINDOW = 0
+    NEAR_DUPLICATE_THRESHOLD = 0.45
+    
+    # Burst coalescing: tweets from these accounts are held for COALESCE_WINDOW seconds and,
+    # if more arrive in the meantime, sent together as one digest (0 = send every tweet on its own)
+    COALESCE_WINDOW = 0
+    COALESCE_ACCOUNTS = ["HandofArsenal"]
+
+# Compile the filtering rules once, when the config is loaded
+Config.RULES = RuleEngine(Config.KEYWORDS, Config.EXCLUDE_KEYWORDS, Config.ACCOUNT_RULES)
\ No newline at end of file
@@ -0,0 +1,119 @@
+import time
+import queue
+import itertools
+import threading
+from metrics import metrics
+from pacing import message_sends
+
+class DeliveryWorker:
+    """Sends queued tweets to WhatsApp from its own thread so scraping never waits on delivery.
+    The most urgent tweet goes first, as fast as the token bucket allows"""
+    
+    def __init__(self, sender, max_size, recover_sender=None, watchdog=None, outbox=None, bucket=None):
+        self.sender = sender
+        self.recover_sender = recover_sender
+        self.watchdog = watchdog
+        self.outbox = outbox
+        self.bucket = bucket
+        # Entries are (-priority, sequence, item), so equal priorities go out in queueing order
+        self.queue = queue.PriorityQueue(maxsize=max_size)
+        self.sequence = itertools.count()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="whatsapp-sender", daemon=True)
+    
+    def start(self):
+        """Start draining the send queue"""
+        self.thread.start()
+        print(f"✅ WhatsApp sender worker started (queue size {self.queue.maxsize})")
+    
+    def enqueue(self, tweet, key=None, check_chat=False, priority=0):
+        """Queue a tweet or digest for delivery, blocking while the queue is full.
+        The result is recorded under key in the outbox; check_chat skips it if it is already in the group"""
+        if self.queue.full():
+            print(f"⏳ Send queue full ({self.queue.maxsize} tweets), waiting for WhatsApp to catch up...")
+        
+        item = {'tweet': tweet, 'key': key, 'check_chat': check_chat, 'priority': priority, 'queued_at': time.time()}
+        self.queue.put((-priority, next(self.sequence), item))
+        metrics.set_gauge("send_queue_depth", self.queue.qsize())
+        print(f"📥 Queued tweet from @{tweet['username']} with priority {priority} (queue depth {self.queue.qsize()})")
+    
+    def depth(self):
+        """Number of tweets waiting to be sent"""
+        return self.queue.qsize()
+    
+    def _run(self):
+        """Send queued tweets one at a time until stopped"""
+        while not self.stopping.is_set():
+            # Wait for the rate limit before picking, so a more urgent tweet queued meanwhile still goes first
+            if self.bucket:
+                time.sleep(self.bucket.wait_time(time.monotonic()))
+            
+            _, _, item = self.queue.get()
+            if item is None:
+                break
+            
+            tweet = item['tweet']
+            if self.bucket:
+                self.bucket.take(time.monotonic(), message_sends(tweet))
+            metrics.observe("send_queue_wait_seconds", time.time() - item['queued_at'], priority=str(item['priority']))
+            metrics.set_gauge("send_queue_depth", self.queue.qsize())
+            sent = False
+            try:
+                self._ensure_session()
+                sent = self.sender.send(tweet, check_chat=item['check_chat'])
+                
+                if sent:
+                    # Latency from the moment the scraper saw the tweet, falling back to queue time
+                    scraped_at = tweet.get('scraped_at', item['queued_at'])
+                    print(f"📤 Delivered tweet from @{tweet['username']} "
+                          f"{time.time() - scraped_at:.1f}s after scraping, "
+                          f"{time.time() - item['queued_at']:.1f}s after queueing with priority {item['priority']} "
+                          f"(queue depth {self.queue.qsize()})")
+            except Exception as e:
+                print(f"❌ Sender worker failed to deliver tweet from @{tweet['username']}: {e}")
+            finally:
+                if self.outbox and item['key']:
+                    self.outbox.record_result(item['key'], sent)
+                self.queue.task_done()
+            
+            if self.queue.empty():
+                # Confirmations are journaled in one write once the queue drains
+                if self.outbox:
+                    self.outbox.flush()
+                self._restart_if_bloated()
+    
+    def _ensure_session(self):
+        """Recover the sender browser if its session has died"""
+        try:
+            self.sender.driver.current_url
+        except Exception as e:
+            if not self.recover_sender:
+                raise
+            print(f"⚠️ WhatsApp browser session lost: {e}")
+            self.sender = self.recover_sender()
+    
+    def _restart_if_bloated(self):
+        """Restart the sender browser while the queue is empty, once it has outgrown the memory limit"""
+        if not self.watchdog or not self.recover_sender:
+            return
+        if self.watchdog.needs_restart(self.sender.driver, "whatsapp"):
+            try:
+                self.sender = self.recover_sender()
+            except Exception as e:
+                # The next send retries through _ensure_session
+                print(f"❌ Could not restart the WhatsApp browser: {e}")
+    
+    def stop(self, timeout=30):
+        """Stop the worker after the message currently being sent"""
+        self.stopping.set()
+        
+        # Wake the worker if it is waiting on an empty queue; the stop marker sorts ahead of every tweet
+        try:
+            self.queue.put_nowait((float('-inf'), -1, None))
+        except queue.Full:
+            pass
+        
+        self.thread.join(timeout)
+        remaining = sum(1 for _, _, item in list(self.queue.queue) if item)
+        if remaining:
+            print(f"⚠️ {remaining} queued tweets were not delivered")
\ No newline at end of file
@@ -1,5 +1,17 @@
+import argparse
 from bot import TwitterWhatsAppBot
 
 if __name__ == "__main__":
-    bot = TwitterWhatsAppBot()
-    bot.start_monitoring()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Forward tweets from monitored X accounts to a WhatsApp group")
+    role = parser.add_mutually_exclusive_group()
+    role.add_argument("--shard", metavar="ID", help="scrape this shard's share of the accounts for the delivery process")
+    role.add_argument("--deliver", action="store_true", help="send the tweets that shards have spooled")
+    args = parser.parse_args()
+    
+    if args.shard:
+        TwitterWhatsAppBot(shard_id=args.shard).start_shard()
+    elif args.deliver:
+        TwitterWhatsAppBot().start_delivery()
+    else:
+        bot = TwitterWhatsAppBot()
+        bot.start_monitoring()
\ No newline at end of file
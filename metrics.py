@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "football_news_bot_"
+
+# Upper bounds in seconds, wide enough for both script calls and full page loads
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+class Histogram:
+    """Cumulative bucket counts plus sum and count, in the Prometheus layout"""
+    
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs, ending with +Inf"""
+        total = 0
+        pairs = []
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+class Metrics:
+    """Thread-safe counters, gauges and histograms shared by the whole bot"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+    
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+    
+    def inc(self, name, amount=1, **labels):
+        """Increase a counter"""
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+    
+    def total(self, name):
+        """Sum of a counter over all its label values"""
+        with self.lock:
+            return sum(value for (key, _), value in self.counters.items() if key == name)
+    
+    def set_gauge(self, name, value, **labels):
+        """Set a gauge to the latest value"""
+        with self.lock:
+            self.gauges[self._key(name, labels)] = value
+    
+    def observe(self, name, value, **labels):
+        """Record a value, usually a duration in seconds, in a histogram"""
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+    
+    @contextmanager
+    def timer(self, stage, **labels):
+        """Time a pipeline stage into the stage_duration_seconds histogram"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_duration_seconds", time.perf_counter() - started, stage=stage, **labels)
+    
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = []
+        for name, value in pairs:
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped.append(f'{name}="{value}"')
+        return "{" + ",".join(escaped) + "}"
+    
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            for kind, values in (("counter", self.counters), ("gauge", self.gauges)):
+                typed = set()
+                for (name, labels), value in sorted(values.items()):
+                    if name not in typed:
+                        lines.append(f"# TYPE {PREFIX}{name} {kind}")
+                        typed.add(name)
+                    lines.append(f"{PREFIX}{name}{self._format_labels(labels)} {value}")
+            
+            typed = set()
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {PREFIX}{name} histogram")
+                    typed.add(name)
+                for bound, count in histogram.cumulative():
+                    lines.append(f"{PREFIX}{name}_bucket{self._format_labels(labels, [('le', bound)])} {count}")
+                lines.append(f"{PREFIX}{name}_sum{self._format_labels(labels)} {histogram.sum}")
+                lines.append(f"{PREFIX}{name}_count{self._format_labels(labels)} {histogram.count}")
+        
+        return "\n".join(lines) + "\n"
+    
+    def snapshot(self):
+        """All metrics as a JSON-friendly dictionary"""
+        def entry(name, labels, **values):
+            return dict(name=name, labels=dict(labels), **values)
+        
+        with self.lock:
+            return {
+                'generated_at': time.time(),
+                'counters': [entry(name, labels, value=value) for (name, labels), value in self.counters.items()],
+                'gauges': [entry(name, labels, value=value) for (name, labels), value in self.gauges.items()],
+                'histograms': [
+                    entry(name, labels, count=histogram.count, sum=histogram.sum,
+                          buckets=[[str(bound), count] for bound, count in histogram.cumulative()])
+                    for (name, labels), histogram in self.histograms.items()
+                ],
+            }
+    
+    def start_http_server(self, port, host="127.0.0.1"):
+        """Serve /metrics in Prometheus format from a background thread"""
+        registry = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"📊 Metrics available at http://{host}:{port}/metrics")
+        return server
+    
+    def start_json_flush(self, path, interval):
+        """Write a JSON snapshot to path every interval seconds from a background thread"""
+        def flush_forever():
+            while True:
+                time.sleep(interval)
+                self.flush_json(path)
+        
+        threading.Thread(target=flush_forever, name="metrics-flush", daemon=True).start()
+    
+    def flush_json(self, path):
+        """Write the current snapshot to path, replacing the previous one atomically"""
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write metrics to {path}: {e}")
+
+# Shared by every module so all stages report into one registry
+metrics = Metrics()
@@ -0,0 +1,118 @@
+import re
+import time
+import random
+import hashlib
+import unicodedata
+from collections import deque
+
+# Words that carry no story on their own, so rewordings don't differ on them
+STOPWORDS = frozenset("""
+a an and are as at be been but by for from has have he her his i in is it its of on or our she so that the
+their them they this to was we were will with you your just now more new after over into than not no yes
+understand told sources source told per according report reports reporting breaking exclusive update
+""".split())
+
+URL_PATTERN = re.compile(r'https?://\S+')
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Tweets with fewer distinct words are too short to compare reliably
+MIN_TOKENS = 4
+
+# Word hashes are 32-bit and permuted with multiply-shift hashing, which keeps the arithmetic
+# within 64 bits and avoids a modulo per value
+MASK64 = (1 << 64) - 1
+
+def tokenize(text):
+    """Distinct meaningful words of a tweet: lowercased, accents folded, links and stopwords dropped"""
+    text = unicodedata.normalize('NFKD', URL_PATTERN.sub(' ', text.lower()))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return frozenset(word for word in WORD_PATTERN.findall(text) if word not in STOPWORDS and len(word) > 1)
+
+def jaccard(first, second):
+    """Share of words two token sets have in common"""
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+class NearDuplicateFilter:
+    """Remembers recently forwarded tweets in a MinHash LSH index and finds new tweets
+    from other accounts that tell the same story in different words"""
+    
+    def __init__(self, window, threshold, num_perm=64, bands=32, seed=1):
+        self.window = window
+        self.threshold = threshold
+        self.rows = num_perm // bands
+        self.bands = bands
+        rng = random.Random(seed)
+        self.permutations = [(rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(num_perm)]
+        # Oldest first, so expiry only looks at the front
+        self.entries = deque()
+        # (band, band values) -> {entry number: entry}
+        self.buckets = {}
+        self.added = 0
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def _signature(self, tokens):
+        """MinHash signature: for each hash permutation, the smallest permuted word hash"""
+        hashes = [int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little')
+                  for token in tokens]
+        # The high 32 bits of (a * h + b) mod 2^64 order the words; comparing the masked values gives the same minimum
+        return [min([(a * h + b) & MASK64 for h in hashes]) >> 32 for a, b in self.permutations]
+    
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [(band, tuple(signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+    
+    def check(self, tweet, now=None):
+        """Return (earlier tweet, similarity) if another account already forwarded the same story
+        within the window. Otherwise remember this tweet and return None"""
+        now = now or time.time()
+        self._expire(now)
+        
+        tokens = tokenize(tweet['text'])
+        if len(tokens) < MIN_TOKENS:
+            return None
+        
+        band_keys = self._band_keys(self._signature(tokens))
+        best, best_score = None, 0.0
+        for key in band_keys:
+            for entry in self.buckets.get(key, {}).values():
+                if entry['username'] == tweet['username']:
+                    continue
+                # LSH only proposes candidates; the exact overlap decides
+                score = jaccard(tokens, entry['tokens'])
+                if score > best_score:
+                    best, best_score = entry, score
+        
+        if best and best_score >= self.threshold:
+            return best['tweet'], best_score
+        
+        self._add(tweet, tokens, band_keys, now)
+        return None
+    
+    def _add(self, tweet, tokens, band_keys, now):
+        self.added += 1
+        entry = {
+            'number': self.added,
+            'tweet': {'username': tweet['username'], 'link': tweet['link'], 'text': tweet['text']},
+            'username': tweet['username'],
+            'tokens': tokens,
+            'band_keys': band_keys,
+            'added_at': now,
+        }
+        self.entries.append(entry)
+        for key in band_keys:
+            self.buckets.setdefault(key, {})[entry['number']] = entry
+    
+    def _expire(self, now):
+        """Forget tweets forwarded longer ago than the window"""
+        cutoff = now - self.window
+        while self.entries and self.entries[0]['added_at'] < cutoff:
+            entry = self.entries.popleft()
+            for key in entry['band_keys']:
+                bucket = self.buckets[key]
+                del bucket[entry['number']]
+                if not bucket:
+                    del self.buckets[key]
\ No newline at end of file
@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import threading
+from config import Config
+from metrics import metrics
+
+# Finished records are rewritten away once they outnumber live ones by this many
+COMPACT_SLACK = 100
+
+def message_key(message):
+    """Outbox key of a tweet or digest: the IDs of the tweets it carries"""
+    return ",".join(str(tweet['id']) for tweet in message.get('tweets', [message]))
+
+class Outbox:
+    """Journal of tweets and digests on their way to WhatsApp. Each message is recorded as pending before it is sent
+    and as sent once WhatsApp confirms it, so a restart replays exactly the messages that may not have gone out"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        # Key -> entry, oldest first
+        self.entries = {}
+        # Journal records not written yet; flush() writes them in one go
+        self.buffer = []
+        self.records_on_disk = 0
+        self._load()
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def add(self, message):
+        """Record a message as pending. Call flush() before sending it so the record survives a crash"""
+        key = message_key(message)
+        with self.lock:
+            if key not in self.entries:
+                entry = self._new_entry(key, message, time.time())
+                self.entries[key] = entry
+                self.buffer.append(self._pending_record(entry))
+            metrics.set_gauge("outbox_pending", len(self.entries))
+        return key
+    
+    def due(self, now=None):
+        """Entries waiting for an attempt whose retry time has come, oldest first"""
+        now = now or time.time()
+        with self.lock:
+            return [entry for entry in self.entries.values() if not entry['in_flight'] and entry['retry_at'] <= now]
+    
+    def claim(self, entry):
+        """Mark an entry as being sent so it is not handed out twice. Returns False if someone else has it"""
+        with self.lock:
+            if entry['in_flight'] or self.entries.get(entry['key']) is not entry:
+                return False
+            entry['in_flight'] = True
+            return True
+    
+    def seconds_until_due(self, now=None):
+        """Seconds until the next retry is due, or None if nothing is waiting"""
+        now = now or time.time()
+        with self.lock:
+            waiting = [entry['retry_at'] for entry in self.entries.values() if not entry['in_flight']]
+        return max(0, min(waiting) - now) if waiting else None
+    
+    def record_result(self, key, sent):
+        """Finish a claimed entry, scheduling a retry with exponential backoff if it was not confirmed"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if not entry:
+                return
+            entry['in_flight'] = False
+            
+            if sent:
+                del self.entries[key]
+                self.buffer.append({'op': 'sent', 'key': key})
+            else:
+                self._schedule_retry(entry)
+            metrics.set_gauge("outbox_pending", len(self.entries))
+    
+    def _schedule_retry(self, entry):
+        message = entry['message']
+        entry['attempts'] += 1
+        # The message may have been submitted before the failure, so the chat is checked before resending
+        entry['maybe_sent'] = True
+        
+        if entry['attempts'] >= Config.OUTBOX_MAX_ATTEMPTS:
+            del self.entries[entry['key']]
+            self.buffer.append({'op': 'dropped', 'key': entry['key']})
+            metrics.inc("outbox_dropped_total")
+            print(f"❌ Giving up on the message from @{message['username']} after {entry['attempts']} attempts: "
+                  f"{message['link']}")
+            return
+        
+        delay = min(Config.OUTBOX_RETRY_BASE * 2 ** (entry['attempts'] - 1), Config.OUTBOX_RETRY_MAX_DELAY)
+        entry['retry_at'] = time.time() + delay
+        self.buffer.append({'op': 'failed', 'key': entry['key'], 'attempts': entry['attempts'],
+                            'retry_at': entry['retry_at']})
+        metrics.inc("send_retries_total")
+        print(f"🔁 Message from @{message['username']} not confirmed, retrying in {delay:.0f}s "
+              f"(attempt {entry['attempts'] + 1} of {Config.OUTBOX_MAX_ATTEMPTS})")
+    
+    def flush(self):
+        """Write records added since the last flush in a single synced write, compacting once most are finished"""
+        with self.lock:
+            if self.records_on_disk + len(self.buffer) > COMPACT_SLACK + 2 * len(self.entries):
+                self._compact()
+                return
+            if not self.buffer:
+                return
+            
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(json.dumps(record) + '\n' for record in self.buffer))
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as e:
+                # Kept in the buffer and written with the next flush
+                print(f"⚠️ Could not write outbox {self.path}: {e}")
+                return
+            
+            self.records_on_disk += len(self.buffer)
+            self.buffer = []
+    
+    @staticmethod
+    def _new_entry(key, message, added_at):
+        return {
+            'key': key,
+            'message': message,
+            'added_at': added_at,
+            'attempts': 0,
+            'retry_at': 0,
+            'maybe_sent': False,
+            'in_flight': False,
+        }
+    
+    @staticmethod
+    def _pending_record(entry):
+        return {'op': 'pending', 'key': entry['key'], 'message': entry['message'], 'at': entry['added_at']}
+    
+    def _load(self):
+        """Replay the journal, keeping messages that were never confirmed"""
+        if not os.path.exists(self.path):
+            return
+        
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError as e:
+            print(f"⚠️ Could not load outbox {self.path}: {e}")
+            return
+        
+        damaged = False
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A partial record left by an interrupted write
+                damaged = True
+                continue
+            
+            key = record.get('key')
+            if record.get('op') == 'pending':
+                self.entries[key] = self._new_entry(key, record['message'], record.get('at', time.time()))
+            elif record.get('op') == 'failed' and key in self.entries:
+                self.entries[key]['attempts'] = record['attempts']
+            elif record.get('op') in ('sent', 'dropped'):
+                self.entries.pop(key, None)
+        self.records_on_disk = len(lines)
+        
+        # These may have gone out just before the restart, so the chat is checked before each is resent
+        for entry in self.entries.values():
+            entry['maybe_sent'] = True
+        if self.entries:
+            print(f"📮 {len(self.entries)} messages in {self.path} were not confirmed before the last stop")
+        metrics.set_gauge("outbox_pending", len(self.entries))
+        
+        # Appending after a partial line would damage the next record too
+        if damaged:
+            self._compact()
+    
+    def _compact(self):
+        """Rewrite the journal with only the messages still waiting"""
+        records = []
+        for entry in self.entries.values():
+            records.append(self._pending_record(entry))
+            if entry['attempts']:
+                records.append({'op': 'failed', 'key': entry['key'], 'attempts': entry['attempts'],
+                                'retry_at': entry['retry_at']})
+        
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(record) + '\n' for record in records))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not compact outbox {self.path}: {e}")
+            return
+        
+        self.records_on_disk = len(records)
+        self.buffer = []
\ No newline at end of file
@@ -0,0 +1,53 @@
+from rules import KeywordMatcher
+
+def message_sends(message):
+    """Number of WhatsApp messages a tweet or digest goes out as"""
+    return len(message.get('parts', [None]))
+
+class TokenBucket:
+    """WhatsApp's safe send rate. After a quiet spell up to `burst` messages go out back to back,
+    after that one every 60 / rate_per_minute seconds. A rate of 0 turns pacing off"""
+    
+    def __init__(self, rate_per_minute, burst):
+        self.rate = rate_per_minute / 60
+        self.burst = max(burst, 1)
+        self.tokens = self.burst
+        self.updated = None
+    
+    def _refill(self, now):
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, now):
+        """Seconds until the next message may be sent"""
+        if not self.rate:
+            return 0
+        self._refill(now)
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+    
+    def take(self, now, count=1):
+        """Spend tokens on a message sent now. A digest of several parts may overdraw, delaying the next one"""
+        if not self.rate:
+            return
+        self._refill(now)
+        self.tokens -= count
+
+class MessagePriority:
+    """Orders waiting messages: the account's priority, plus a boost when a tweet has an urgent phrase.
+    A digest ranks as its most urgent tweet"""
+    
+    def __init__(self, account_priorities, urgent_keywords, urgent_boost):
+        self.account_priorities = {username.lower(): priority for username, priority in account_priorities.items()}
+        self.urgent_matcher = KeywordMatcher(urgent_keywords)
+        self.urgent_boost = urgent_boost
+    
+    def score(self, message):
+        """Higher goes out first"""
+        return max(self._tweet_score(tweet) for tweet in message.get('tweets', [message]))
+    
+    def _tweet_score(self, tweet):
+        score = self.account_priorities.get(tweet['username'].lower(), 0)
+        if self.urgent_matcher.matches(tweet['text']):
+            score += self.urgent_boost
+        return score
\ No newline at end of file
@@ -0,0 +1,77 @@
+import re
+
+class KeywordMatcher:
+    """Keywords and hashtags folded into one precompiled pattern, and exclusions into another"""
+    
+    def __init__(self, keywords, exclusions=()):
+        self.pattern = re.compile(self._alternation(keywords)) if keywords else None
+        # Searched on its own, so an exclusion inside a longer keyword such as "Arsenal women" is still found
+        self.exclusion_pattern = re.compile(self._alternation(exclusions)) if exclusions else None
+    
+    @classmethod
+    def _alternation(cls, keywords):
+        """Build one pattern with the same boundaries the per-keyword checks used"""
+        words = [keyword.lower() for keyword in keywords if not keyword.startswith('#')]
+        hashtags = [keyword.lower() for keyword in keywords if keyword.startswith('#')]
+        
+        alternatives = []
+        if words:
+            # Regular words use word boundaries
+            alternatives.append(r'\b' + cls._trie_pattern(words) + r'\b')
+        if hashtags:
+            # Hashtags must be followed by space, punctuation, or end of string,
+            # which prevents #AFC from matching #AFCB
+            alternatives.append(cls._trie_pattern(hashtags) + r'(?=\s|[^\w]|$)')
+        return "|".join(alternatives)
+    
+    @staticmethod
+    def _trie_pattern(keywords):
+        """Regex for a prefix trie of the keywords, so shared prefixes are only tried once"""
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        
+        def build(node):
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            if len(branches) == 1 and '' not in node:
+                return branches[0]
+            pattern = '(?:' + '|'.join(branches) + ')'
+            # A keyword ends here, so the longer continuations are optional
+            return pattern + '?' if '' in node else pattern
+        
+        return build(trie)
+    
+    def matches(self, text, include_all=False):
+        """Check the text contains a keyword (or anything, with include_all) and no exclusion"""
+        text_lower = text.lower()
+        if self.exclusion_pattern and self.exclusion_pattern.search(text_lower):
+            return False
+        return include_all or (self.pattern is not None and self.pattern.search(text_lower) is not None)
+
+class RuleEngine:
+    """Per-account include/exclude rules, compiled once from the config"""
+    
+    def __init__(self, keywords, exclusions, account_rules):
+        self.default_matcher = KeywordMatcher(keywords, exclusions)
+        self.account_rules = {}
+        
+        for username, rules in account_rules.items():
+            matcher = KeywordMatcher(
+                list(keywords) + rules.get('keywords', []),
+                list(exclusions) + rules.get('exclude', [])
+            )
+            self.account_rules[username.lower()] = (rules.get('include_all', False), matcher)
+    
+    def contains_keywords(self, text):
+        """Check text against the global keywords and exclusions"""
+        return self.default_matcher.matches(text)
+    
+    def should_include(self, username, text):
+        """Apply the account's rules, or the global ones if it has none"""
+        include_all, matcher = self.account_rules.get(username.lower(), (False, self.default_matcher))
+        return matcher.matches(text, include_all=include_all)
@@ -0,0 +1,140 @@
+import time
+import heapq
+import random
+from datetime import datetime
+from config import Config
+
+class PollScheduler:
+    """Schedules each account's next check from how often it has been posting recently"""
+    
+    def __init__(self, accounts):
+        self.intervals = {username: Config.CHECK_INTERVAL for username in accounts}
+        self.post_rates = {}  # smoothed posts per hour
+        self.high_activity_windows = [
+            (datetime.fromisoformat(start), datetime.fromisoformat(end))
+            for start, end in Config.HIGH_ACTIVITY_WINDOWS
+        ]
+        
+        # Everyone is due straight away on start
+        now = time.time()
+        # Each account's one current check time. Rescheduling leaves the old heap entry behind,
+        # and entries that no longer match are skipped when they reach the top
+        self.due_at = {username: now for username in accounts}
+        self.queue = [(now, username) for username in accounts]
+        heapq.heapify(self.queue)
+    
+    def _drop_stale(self):
+        while self.queue and self.due_at.get(self.queue[0][1]) != self.queue[0][0]:
+            heapq.heappop(self.queue)
+    
+    def due_accounts(self, now=None):
+        """Remove and return every account whose next check time has passed"""
+        now = now or time.time()
+        due = []
+        self._drop_stale()
+        while self.queue and self.queue[0][0] <= now:
+            username = heapq.heappop(self.queue)[1]
+            del self.due_at[username]
+            due.append(username)
+            self._drop_stale()
+        return due
+    
+    def seconds_until_next(self, now=None):
+        """Seconds until the next account is due, with the account name"""
+        self._drop_stale()
+        if not self.queue:
+            return Config.CHECK_INTERVAL, None
+        due_at, username = self.queue[0]
+        return max(0, due_at - (now or time.time())), username
+    
+    def record_check(self, username, post_times, now=None):
+        """Update an account's post rate from a check and schedule its next one.
+        post_times is None when the check failed, which keeps the previous rate."""
+        now = now or time.time()
+        
+        if post_times is not None:
+            observed = self._observed_rate(post_times, now)
+            previous = self.post_rates.get(username)
+            if previous is None:
+                self.post_rates[username] = observed
+            else:
+                smoothing = Config.POLL_RATE_SMOOTHING
+                self.post_rates[username] = smoothing * observed + (1 - smoothing) * previous
+        
+        interval = self._interval_for(username, now)
+        self.intervals[username] = interval
+        
+        jitter = random.uniform(1 - Config.POLL_JITTER, 1 + Config.POLL_JITTER)
+        # Replaces any check already scheduled, e.g. when a combined timeline covered an account that was not due
+        self.due_at[username] = now + interval * jitter
+        heapq.heappush(self.queue, (self.due_at[username], username))
+    
+    def set_accounts(self, accounts, now=None):
+        """Schedule exactly these accounts from now on. Added accounts are due straight away;
+        post rates are kept, so an account that comes back picks up its old interval"""
+        now = now or time.time()
+        self.due_at = {username: self.due_at.get(username, now) for username in accounts}
+        self.queue = [(due_at, username) for username, due_at in self.due_at.items()]
+        heapq.heapify(self.queue)
+        
+        self.intervals = {username: self.intervals.get(username, Config.CHECK_INTERVAL) for username in accounts}
+    
+    def reschedule_missing(self, accounts, now=None):
+        """Put back accounts that a failed cycle took off the queue without checking"""
+        for username in accounts:
+            if username not in self.due_at:
+                self.record_check(username, None, now)
+    
+    def _observed_rate(self, post_times, now):
+        """Posts per hour over the rate window, from the timestamps visible on the profile"""
+        window_seconds = Config.POLL_RATE_WINDOW_HOURS * 3600
+        ages = []
+        for timestamp in post_times:
+            try:
+                posted = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            except (AttributeError, ValueError):
+                continue
+            ages.append(max(0, now - posted.timestamp()))
+        
+        recent = [age for age in ages if age <= window_seconds]
+        if not recent:
+            return 0.0
+        
+        # If every visible post is recent the profile only shows part of the window,
+        # so measure the rate over the span the visible posts actually cover
+        if len(recent) == len(ages):
+            window_seconds = max(max(recent), Config.POLL_MIN_INTERVAL)
+        
+        return len(recent) / (window_seconds / 3600)
+    
+    def _interval_for(self, username, now):
+        """Interval that keeps the expected number of posts per check near the target"""
+        rate = self.post_rates.get(username)
+        if rate is None:
+            interval = Config.CHECK_INTERVAL
+        elif rate <= 0:
+            interval = Config.POLL_MAX_INTERVAL
+        else:
+            interval = Config.POLL_TARGET_POSTS_PER_CHECK * 3600 / rate
+        
+        if self._in_high_activity_window(now):
+            interval *= Config.HIGH_ACTIVITY_INTERVAL_FACTOR
+        
+        return min(max(interval, Config.POLL_MIN_INTERVAL), Config.POLL_MAX_INTERVAL)
+    
+    def _in_high_activity_window(self, now):
+        """Check whether now falls inside a configured high-activity window (local time)"""
+        current = datetime.fromtimestamp(now)
+        return any(start <= current <= end for start, end in self.high_activity_windows)
+    
+    def expected_detection_latency(self, username):
+        """Average delay between a post and the check that finds it: half the interval"""
+        return self.intervals[username] / 2
+    
+    def report(self):
+        """Print each account's interval, post rate and expected detection latency"""
+        for username in sorted(self.intervals, key=self.intervals.get):
+            rate = self.post_rates.get(username)
+            rate_text = f"{rate:.1f} posts/h" if rate is not None else "rate unknown"
+            print(f"   @{username}: every {self.intervals[username]:.0f}s ({rate_text}), "
+                  f"expected detection latency {self.expected_detection_latency(username):.0f}s")
\ No newline at end of file
@@ -0,0 +1,89 @@
+import time
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from twitter_scraper import TwitterScraper, AccountState
+
+class ScraperPool:
+    """Scrapes several accounts at once, with one browser owned by each worker.
+    Any worker may check any account, so they all share one AccountState"""
+    
+    def __init__(self, driver_factory, size, cookies, account_state=None):
+        self.driver_factory = driver_factory
+        self.cookies = cookies
+        self.account_state = account_state or AccountState()
+        self.scrapers = []
+        self.idle_scrapers = queue.Queue()
+        self.last_post_times = {}
+        
+        print(f"🔧 Starting scraper pool with {size} browsers...")
+        for index in range(size):
+            scraper = TwitterScraper(self._start_driver(index), self.account_state)
+            scraper.pool_index = index
+            self.scrapers.append(scraper)
+            self.idle_scrapers.put(scraper)
+        
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="scraper")
+        print("✅ Scraper pool ready")
+    
+    def _start_driver(self, index):
+        """Start a pool browser and copy the X.com login cookies into it"""
+        driver = self.driver_factory(f"{Config.SCRAPER_POOL_PROFILE_DIR}_{index}")
+        driver.get("https://x.com")
+        for cookie in self.cookies:
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                pass
+        return driver
+    
+    def check_accounts(self, usernames):
+        """Scrape all accounts concurrently, returning (username, tweets, seconds, error) in input order"""
+        futures = [self.executor.submit(self._check_account, username) for username in usernames]
+        return [future.result() for future in futures]
+    
+    def _check_account(self, username):
+        """Borrow an idle browser, scrape one account and hand the browser back"""
+        scraper = self.idle_scrapers.get()
+        started = time.monotonic()
+        
+        try:
+            tweets = scraper.check_account_tweets(username)
+            self.last_post_times[username] = scraper.last_post_times.get(username)
+            return username, tweets, time.monotonic() - started, None
+        except Exception as e:
+            error_msg = str(e)
+            if "invalid session id" in error_msg or "chrome not reachable" in error_msg:
+                print(f"⚠️ Pool browser {scraper.pool_index} lost its session, restarting it...")
+                self._restart_scraper(scraper)
+            self.last_post_times[username] = None
+            return username, [], time.monotonic() - started, error_msg
+        finally:
+            self.idle_scrapers.put(scraper)
+    
+    def _restart_scraper(self, scraper):
+        """Replace a crashed pool browser with a fresh one"""
+        try:
+            scraper.driver.quit()
+        except:
+            pass
+        
+        try:
+            scraper.set_driver(self._start_driver(scraper.pool_index))
+        except Exception as e:
+            print(f"❌ Could not restart pool browser {scraper.pool_index}: {e}")
+    
+    def restart_bloated(self, watchdog):
+        """Restart pool browsers that have outgrown the memory limit. Only call this between cycles"""
+        for scraper in self.scrapers:
+            if watchdog.needs_restart(scraper.driver, f"pool_{scraper.pool_index}"):
+                self._restart_scraper(scraper)
+    
+    def quit(self):
+        """Stop the workers and close every pool browser"""
+        self.executor.shutdown(wait=True)
+        for scraper in self.scrapers:
+            try:
+                scraper.driver.quit()
+            except:
+                pass
@@ -0,0 +1,95 @@
+import os
+import json
+import threading
+from urllib.parse import urlparse
+
+# Fields Network.setCookies accepts; Network.getAllCookies returns a few more
+COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires", "priority")
+
+READ_LOCAL_STORAGE_SCRIPT = "return Object.assign({}, window.localStorage);"
+
+WRITE_LOCAL_STORAGE_SCRIPT = """
+for (const [key, value] of Object.entries(arguments[0])) {
+    window.localStorage.setItem(key, value);
+}
+"""
+
+def origin_of(url):
+    """scheme://host of a URL, or None for pages like about:blank"""
+    parsed = urlparse(url or "")
+    if parsed.scheme not in ("http", "https"):
+        return None
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+def _cookie_matches(cookie, origin):
+    """Check whether a cookie is sent to the origin's host"""
+    host = urlparse(origin).hostname or ""
+    domain = cookie.get("domain", "").lstrip(".")
+    return host == domain or host.endswith(f".{domain}")
+
+class SessionSnapshot:
+    """Cookies and local storage of logged-in sites, kept on disk so a fresh browser can be logged back in without prompts"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.origins = {}
+        
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.origins = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Could not load session snapshot {path}: {e}")
+    
+    def capture(self, driver):
+        """Record cookies and local storage for the origin the driver's current tab is on"""
+        origin = origin_of(driver.current_url)
+        if not origin:
+            return False
+        
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+        local_storage = driver.execute_script(READ_LOCAL_STORAGE_SCRIPT) or {}
+        with self.lock:
+            self.origins[origin] = {
+                'cookies': [cookie for cookie in cookies if _cookie_matches(cookie, origin)],
+                'local_storage': local_storage,
+            }
+        return True
+    
+    def restore(self, driver):
+        """Put the saved cookies and local storage back for the current tab's origin.
+        Returns False when nothing was saved for it. Reload the page afterwards for the site to pick them up"""
+        origin = origin_of(driver.current_url)
+        with self.lock:
+            saved = self.origins.get(origin)
+        if not saved:
+            return False
+        
+        cookies = [
+            {field: cookie[field] for field in COOKIE_FIELDS if field in cookie}
+            for cookie in saved['cookies']
+        ]
+        # Session cookies report expires -1, which setCookies would treat as already expired
+        for cookie in cookies:
+            if cookie.get('expires', 0) < 0:
+                del cookie['expires']
+        
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        driver.execute_script(WRITE_LOCAL_STORAGE_SCRIPT, saved['local_storage'])
+        print(f"🍪 Restored {len(cookies)} cookies and {len(saved['local_storage'])} storage entries for {origin}")
+        return True
+    
+    def save(self):
+        """Write the snapshot, readable only by the current user since it holds login cookies"""
+        temp_path = f"{self.path}.tmp"
+        with self.lock:
+            data = json.dumps(self.origins)
+        
+        try:
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save session snapshot {self.path}: {e}")
\ No newline at end of file
@@ -0,0 +1,130 @@
+import os
+import re
+import json
+import time
+import socket
+import hashlib
+from config import Config
+
+SHARD_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+def shard_owner(username, shard_ids):
+    """Shard that checks an account: the one with the highest hash of shard and account (rendezvous hashing).
+    When a shard joins or leaves, only the accounts it gains or loses change hands"""
+    def weight(shard_id):
+        key = f"{shard_id}/{username.lower()}".encode('utf-8')
+        return hashlib.blake2b(key, digest_size=8).digest()
+    return max(shard_ids, key=weight)
+
+def shard_path(path, shard_id):
+    """A shard's own copy of a state file: processed_tweets.bin becomes processed_tweets.shard-a.bin"""
+    if shard_id is None:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.shard-{shard_id}{extension}"
+
+def _write_atomically(path, data):
+    """Write a file under a temporary name and rename it into place, so readers never see half of it"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+class ShardMembership:
+    """Heartbeat files of the running shards in a shared directory. A shard whose heartbeat is older than
+    SHARD_HEARTBEAT_TIMEOUT counts as gone. Pass no shard ID to only watch the others"""
+    
+    def __init__(self, directory, shard_id=None):
+        if shard_id is not None and not SHARD_ID_PATTERN.match(shard_id):
+            raise ValueError(f"Shard ID {shard_id!r} may only contain letters, digits, '-' and '_'")
+        self.directory = directory
+        self.shard_id = shard_id
+        self.last_heartbeat = None
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, shard_id):
+        return os.path.join(self.directory, f"{shard_id}.json")
+    
+    def heartbeat(self, force=False):
+        """Tell the other processes this shard is alive, at most every SHARD_HEARTBEAT_INTERVAL seconds"""
+        now = time.time()
+        if not force and self.last_heartbeat and now - self.last_heartbeat < Config.SHARD_HEARTBEAT_INTERVAL:
+            return
+        _write_atomically(self._path(self.shard_id), json.dumps({
+            'shard_id': self.shard_id,
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'heartbeat_at': now,
+        }))
+        self.last_heartbeat = now
+    
+    def leave(self):
+        """Remove this shard's heartbeat so its accounts move to the others straight away"""
+        try:
+            os.remove(self._path(self.shard_id))
+        except OSError:
+            pass
+    
+    def live_shards(self, now=None):
+        """IDs of shards with a recent heartbeat, including this one, in sorted order"""
+        cutoff = (now or time.time()) - Config.SHARD_HEARTBEAT_TIMEOUT
+        live = {self.shard_id} if self.shard_id is not None else set()
+        
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), 'r', encoding='utf-8') as f:
+                    heartbeat = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                # Removed or replaced while listing; the next look will see it
+                continue
+            if heartbeat.get('heartbeat_at', 0) >= cutoff:
+                live.add(heartbeat['shard_id'])
+        
+        return sorted(live)
+    
+    def owned_accounts(self, accounts):
+        """The accounts this shard should check, given the shards alive right now"""
+        live = self.live_shards()
+        return [username for username in accounts if shard_owner(username, live) == self.shard_id]
+
+class Spool:
+    """Directory of tweet batches handed from shard processes to the delivery process.
+    Each batch is one file, renamed into place once complete and deleted once the delivery process has recorded it"""
+    
+    def __init__(self, directory):
+        self.directory = directory
+        self.written = 0
+        os.makedirs(directory, exist_ok=True)
+    
+    def put(self, shard_id, username, tweets):
+        """Hand over an account's new tweets"""
+        self.written += 1
+        filename = f"{time.time_ns():020d}-{shard_id}-{self.written}.json"
+        _write_atomically(os.path.join(self.directory, filename), json.dumps({
+            'shard_id': shard_id,
+            'username': username,
+            'tweets': tweets,
+        }))
+    
+    def batches(self):
+        """Batches waiting for delivery, oldest first, as (path, batch) pairs"""
+        batches = []
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    batches.append((path, json.load(f)))
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Skipping unreadable spool file {path}: {e}")
+        return batches
+    
+    def remove(self, path):
+        """Forget a batch once its tweets are safely recorded"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
\ No newline at end of file
@@ -0,0 +1,30 @@
+import time
+
+from twitter_scraper import TwitterScraper, build_search_url
+from benchmarks.fake_driver import FakeDriver, FakeTimeline
+
+def relevant_links(tweets_by_account):
+    return [tweet['link'] for tweets in tweets_by_account.values() for tweet in tweets]
+
+def test_tweet_indexed_after_newer_ones_is_still_found(monkeypatch):
+    ornstein, mokbel = FakeTimeline("David_Ornstein"), FakeTimeline("SamiMokbel_BBC")
+    # History posted ten minutes apart, further than the lag the scan reaches back over
+    started = time.time()
+    monkeypatch.setattr(FakeTimeline, "newest_id", 0)
+    for minutes_ago in range(60, 0, -10):
+        monkeypatch.setattr(time, "time", lambda: started - minutes_ago * 60)
+        (ornstein if minutes_ago % 20 else mokbel).post(1, relevant_share=1.0)
+    monkeypatch.undo()
+    timelines = {ornstein.username: ornstein, mokbel.username: mokbel}
+    scraper = TwitterScraper(FakeDriver(timelines, latency=0, page_load_latency=0))
+    url = build_search_url(list(timelines))
+    scraper.check_aggregated_timeline(url, list(timelines))
+    
+    # Ornstein posts first, but search lists his tweet only after a newer one from Mokbel has been seen
+    ornstein.post(1, relevant_share=1.0)
+    late = ornstein.tweets.pop(0)
+    mokbel.post(1, relevant_share=1.0)
+    assert relevant_links(scraper.check_aggregated_timeline(url, list(timelines))) == [mokbel.tweets[0]['link']]
+    
+    ornstein.tweets.insert(0, late)
+    assert relevant_links(scraper.check_aggregated_timeline(url, list(timelines))) == [late['link']]
\ No newline at end of file
@@ -0,0 +1,24 @@
+from config import Config
+from coalescer import TweetCoalescer
+
+def tweet(index, text):
+    return {'id': str(index), 'username': "David_Ornstein", 'text': text,
+            'link': f"https://x.com/David_Ornstein/status/{index}"}
+
+def test_long_tweets_keep_their_links():
+    max_length = 200
+    tweets = [tweet(index, "Arsenal transfer update " * 20) for index in range(3)]
+    digest = TweetCoalescer(60, max_length)._build_digest(tweets)
+    
+    # Every part carries at least one tweet, including the one with the header
+    assert all(links for links in digest['part_links'])
+    assert [link for links in digest['part_links'] for link in links] == [t['link'] for t in tweets]
+    for lines, links in zip(digest['parts'], digest['part_links']):
+        assert len(Config.MESSAGE_PREFIX + "\n".join(lines)) <= max_length
+        assert lines[-1].endswith(links[-1])
+
+def test_short_tweets_share_a_part():
+    tweets = [tweet(index, "Gunners train at London Colney") for index in range(3)]
+    digest = TweetCoalescer(60, 4096)._build_digest(tweets)
+    assert digest['parts'] == [["3 new tweets"] + [f"@David_Ornstein: Gunners train at London Colney | {t['link']}" for t in tweets]]
+    assert digest['part_links'] == [[t['link'] for t in tweets]]
\ No newline at end of file
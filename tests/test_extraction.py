@@ -0,0 +1,145 @@
+import os
+import json
+import random
+import pytest
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+
+from config import Config
+from twitter_scraper import TwitterScraper
+from benchmarks.fake_driver import FakeDriver, FakeTimeline, FIXTURES_DIR, load_fixture
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+EDGE_CASES = os.path.join(FIXTURES, "timeline_edge_cases.json")
+# Timelines as X renders them, saved by `python -m benchmarks.record --html`
+SAVED_PAGES = sorted(
+    os.path.join(FIXTURES, "html", filename) for filename in os.listdir(os.path.join(FIXTURES, "html"))
+    if filename.endswith(".html")
+)
+
+def edge_case_timeline():
+    """Pinned tweet, retweets by label and by "RT @", a media-only tweet, a missing timestamp, emoji and newlines"""
+    with open(EDGE_CASES, 'r', encoding='utf-8') as f:
+        fixture = json.load(f)
+    return FakeTimeline(fixture['username'], fixture['tweets'])
+
+def synthetic_timeline():
+    random.seed(11)
+    timeline = FakeTimeline("synthetic_account")
+    timeline.post(25)
+    return timeline
+
+def recorded_timelines():
+    """Timelines saved by benchmarks.record, if any have been recorded"""
+    if not os.path.isdir(FIXTURES_DIR):
+        return []
+    return [
+        FakeTimeline(filename[:-len(".json")], load_fixture(filename[:-len(".json")]))
+        for filename in sorted(os.listdir(FIXTURES_DIR)) if filename.endswith(".json")
+    ]
+
+TIMELINES = [edge_case_timeline(), synthetic_timeline()] + recorded_timelines()
+
+@pytest.fixture(autouse=True)
+def bulk_backend(monkeypatch):
+    monkeypatch.setattr(Config, "EXTRACTION_BACKEND", "bulk")
+
+# The fake driver runs a Python copy of readTweet(), so these are a fast smoke test of the per-element path
+# and the since ID handling. The saved page tests below run the real script in Chrome
+
+def open_profile(timeline):
+    driver = FakeDriver({timeline.username: timeline}, latency=0, page_load_latency=0)
+    driver.get(f"https://x.com/{timeline.username}")
+    return driver, TwitterScraper(driver)
+
+@pytest.mark.parametrize("timeline", TIMELINES, ids=lambda timeline: timeline.username)
+def test_bulk_matches_per_element(timeline):
+    driver, scraper = open_profile(timeline)
+    assert scraper._extract_tweets_bulk() == scraper._extract_tweets_per_element(limit=driver.page_size)
+
+@pytest.mark.parametrize("timeline", TIMELINES, ids=lambda timeline: timeline.username)
+def test_bulk_matches_per_element_after_since_id(timeline):
+    driver, scraper = open_profile(timeline)
+    originals = [tweet for tweet in scraper._extract_tweets_bulk() if not tweet['is_retweet'] and not tweet['is_pinned']]
+    since_id = int(originals[len(originals) // 2]['id'])
+    
+    bulk = scraper._extract_tweets_bulk(since_id)
+    assert bulk == scraper._extract_tweets_per_element(since_id)
+    # Both stop right after the first original tweet that is not newer than the since ID
+    assert int(bulk[-1]['id']) == since_id
+
+def test_edge_cases_are_read_as_expected():
+    driver, scraper = open_profile(edge_case_timeline())
+    tweets = {tweet['id']: tweet for tweet in scraper._extract_tweets_bulk()}
+    
+    assert tweets["1700000000000000001"]['is_pinned']
+    assert tweets["1830000000000000890"]['is_retweet'] and tweets["1830000000000000890"]['author'] == "Arsenal"
+    assert tweets["1830000000000000880"]['is_retweet']
+    assert tweets["1830000000000000860"]['timestamp'] is None
+    assert tweets["1830000000000000900"]['text'] == "Arsenal 🔴⚪\nTeam news: Saka starts, Ødegaard on the bench"
+    # The media-only tweet has no text element and is skipped, like on X
+    assert "1830000000000000870" not in tweets
+
+@pytest.fixture(scope="module")
+def chrome():
+    """Headless Chrome, skipping the test when Chrome or ChromeDriver is not installed"""
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    try:
+        driver = webdriver.Chrome(options=options)
+    except WebDriverException as e:
+        pytest.skip(f"Headless Chrome is not available: {e.msg}")
+    yield driver
+    driver.quit()
+
+def open_saved_page(chrome, path):
+    chrome.get(f"file://{path}")
+    return TwitterScraper(chrome)
+
+@pytest.mark.parametrize("path", SAVED_PAGES, ids=os.path.basename)
+def test_saved_page_bulk_matches_per_element(chrome, path):
+    scraper = open_saved_page(chrome, path)
+    bulk = scraper._extract_tweets_bulk()
+    assert bulk
+    assert bulk == scraper._extract_tweets_per_element(limit=len(bulk) + 5)
+
+@pytest.mark.parametrize("path", SAVED_PAGES, ids=os.path.basename)
+def test_saved_page_bulk_matches_per_element_after_since_id(chrome, path):
+    scraper = open_saved_page(chrome, path)
+    originals = [tweet for tweet in scraper._extract_tweets_bulk() if not tweet['is_retweet'] and not tweet['is_pinned']]
+    since_id = int(originals[len(originals) // 2]['id'])
+    
+    bulk = scraper._extract_tweets_bulk(since_id)
+    assert bulk == scraper._extract_tweets_per_element(since_id)
+    assert int(bulk[-1]['id']) == since_id
+
+def test_saved_page_edge_cases(chrome):
+    scraper = open_saved_page(chrome, os.path.join(FIXTURES, "html", "David_Ornstein.html"))
+    tweets = {tweet['id']: tweet for tweet in scraper._extract_tweets_bulk()}
+    
+    assert tweets["1700000000000000001"]['is_pinned']
+    assert tweets["1830000000000000900"]['link'] == "https://x.com/David_Ornstein/status/1830000000000000900"
+    assert tweets["1830000000000000900"]['timestamp'] == "2026-09-01T18:45:00.000Z"
+    assert "\nTeam news: Saka starts, Ødegaard on the bench" in tweets["1830000000000000900"]['text']
+    # A repost links to the original, so it is attributed to its author
+    assert tweets["1830000000000000890"]['is_retweet'] and tweets["1830000000000000890"]['author'] == "Arsenal"
+    assert tweets["1830000000000000885"]['is_retweet']
+    # The quoted tweet's text is not mixed into the quoting one
+    assert tweets["1830000000000000880"]['text'] == "Wide of the mark, nothing agreed"
+    assert tweets["1830000000000000860"]['timestamp'] is None
+    assert "1830000000000000870" not in tweets
+
+def test_saved_page_since_id_compares_full_status_ids(chrome):
+    """These status IDs are closer together than a double can tell apart, so the scan must stop at the exact one"""
+    scraper = open_saved_page(chrome, os.path.join(FIXTURES, "html", "David_Ornstein.html"))
+    since_id = 1830000000000000880
+    
+    bulk = scraper._extract_tweets_bulk(since_id)
+    assert [tweet['id'] for tweet in bulk] == [
+        "1700000000000000001", "1830000000000000900", "1830000000000000895",
+        "1830000000000000890", "1830000000000000885", "1830000000000000880",
+    ]
+    assert bulk == scraper._extract_tweets_per_element(since_id)
\ No newline at end of file
@@ -0,0 +1,24 @@
+from rules import KeywordMatcher, RuleEngine
+
+def test_exclusion_inside_a_keyword_is_not_forwarded():
+    matcher = KeywordMatcher(["Arsenal women", "Arsenal"], ["women"])
+    assert not matcher.matches("Arsenal women win the derby")
+    assert not matcher.matches("Arsenal women win the derby", include_all=True)
+    assert matcher.matches("Arsenal win the derby")
+
+def test_exclusion_overlapping_a_keyword():
+    matcher = KeywordMatcher(["Arsenal"], ["Arsenal Tula"])
+    assert not matcher.matches("Arsenal Tula sign a striker")
+    assert matcher.matches("Arsenal sign a striker")
+
+def test_hashtags_keep_their_boundaries():
+    matcher = KeywordMatcher(["#AFC"], ["#AFCB"])
+    assert matcher.matches("Big night #AFC")
+    assert not matcher.matches("Big night #AFCB")
+
+def test_account_rules_add_to_the_global_ones():
+    engine = RuleEngine(["Arsenal"], ["women"], {"HandofArsenal": {'include_all': True, 'exclude': ["quiz"]}})
+    assert engine.should_include("HandofArsenal", "Matchday")
+    assert not engine.should_include("HandofArsenal", "Friday quiz time")
+    assert not engine.should_include("HandofArsenal", "Arsenal women squad")
+    assert not engine.should_include("David_Ornstein", "Matchday")
\ No newline at end of file
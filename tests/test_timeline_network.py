@@ -0,0 +1,70 @@
+import os
+import pytest
+
+from timeline_network import parse_timeline_response
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "user_tweets.json")
+
+@pytest.fixture(scope="module")
+def tweets():
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        return {tweet['id']: tweet for tweet in parse_timeline_response(f.read())}
+
+def test_reads_every_tweet_in_timeline_order():
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        ids = [tweet['id'] for tweet in parse_timeline_response(f.read())]
+    # Cursors and unavailable posts are skipped; conversation modules contribute each of their tweets
+    assert ids == [
+        "1700000000000000001",
+        "1830000000000000900",
+        "1830000000000000890",
+        "1830000000000000880",
+        "1830000000000000870",
+        "1830000000000000860",
+        "1830000000000000850",
+        "1830000000000000851",
+    ]
+
+def test_pinned_entry(tweets):
+    pinned = tweets["1700000000000000001"]
+    assert pinned['is_pinned']
+    assert not any(tweet['is_pinned'] for tweet_id, tweet in tweets.items() if tweet_id != pinned['id'])
+    assert pinned['timestamp'] == "2023-08-01T09:00:00.000Z"
+    # t.co links are expanded
+    assert pinned['text'] == "Everything Arsenal, all season https://example.com/arsenal"
+
+def test_plain_tweet(tweets):
+    tweet = tweets["1830000000000000900"]
+    # The trailing media link lies outside the display range
+    assert tweet['text'] == "Arsenal team news: Saka starts, Ødegaard on the bench 🔴⚪"
+    assert tweet['link'] == "https://x.com/David_Ornstein/status/1830000000000000900"
+    assert tweet['author'] == "David_Ornstein"
+    assert tweet['timestamp'] == "2026-09-01T18:45:00.000Z"
+    assert not tweet['is_retweet'] and not tweet['is_pinned']
+
+def test_retweet(tweets):
+    tweet = tweets["1830000000000000890"]
+    assert tweet['is_retweet']
+    assert tweet['text'] == "RT @Arsenal: Confirmed line-up for tonight #AFC"
+    assert tweet['timestamp'] == "2026-09-01T18:40:00.000Z"
+
+def test_quote_tweet_keeps_its_own_text(tweets):
+    tweet = tweets["1830000000000000880"]
+    assert not tweet['is_retweet']
+    assert tweet['link'] == "https://x.com/David_Ornstein/status/1830000000000000880"
+    assert tweet['text'] == ("Wide of the mark, nothing agreed "
+                             "https://twitter.com/FabrizioRomano/status/1830000000000000050")
+    # The quoted post is not reported as a tweet of this timeline
+    assert "1830000000000000050" not in tweets
+
+def test_long_post_uses_note_text_and_legacy_user_layout(tweets):
+    tweet = tweets["1830000000000000870"]
+    assert tweet['text'] == ("Arsenal have agreed a deal in principle. " * 8).strip()
+    assert tweet['author'] == "David_Ornstein"
+    assert tweet['link'] == "https://x.com/David_Ornstein/status/1830000000000000870"
+
+def test_visibility_wrapper_and_conversation_module(tweets):
+    assert tweets["1830000000000000860"]['text'] == "Gunners train at London Colney"
+    assert tweets["1830000000000000860"]['timestamp'] == "2026-09-01T16:00:00.000Z"
+    assert tweets["1830000000000000851"]['text'] == "2/2 Kick-off at 8pm"
+    assert tweets["1830000000000000851"]['timestamp'] == "2026-09-01T15:01:00.000Z"
\ No newline at end of file
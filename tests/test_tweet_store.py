@@ -0,0 +1,60 @@
+import time
+
+from tweet_store import ProcessedTweetStore, RECORD, TWITTER_EPOCH_MS
+
+DAY = 24 * 60 * 60
+
+def test_clock_stepping_back_keeps_expiry_in_order(tmp_path, monkeypatch):
+    path = str(tmp_path / "processed_tweets.bin")
+    now = [1_800_000_000]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    
+    store = ProcessedTweetStore(path, retention_days=1)
+    store.add("1830000000000000900")
+    now[0] -= 2 * DAY
+    store.add("1830000000000000901")
+    
+    now[0] += 2 * DAY + DAY // 2
+    store.save()
+    cutoff = now[0] - DAY
+    # Nothing past its window is left behind a newer entry
+    assert all(added_at >= cutoff for added_at in store.seen.values())
+    
+    now[0] += DAY
+    store.save()
+    assert len(store) == 0
+
+def test_loads_records_written_out_of_order(tmp_path, monkeypatch):
+    path = str(tmp_path / "processed_tweets.bin")
+    now = 1_800_000_000
+    monkeypatch.setattr(time, "time", lambda: now)
+    # The newer record comes first, as after a clock step back
+    with open(path, 'wb') as f:
+        f.write(RECORD.pack(1, now - 100) + RECORD.pack(2, now - DAY + 10) + RECORD.pack(3, now - 200))
+    
+    store = ProcessedTweetStore(path, retention_days=1)
+    monkeypatch.setattr(time, "time", lambda: now + 60)
+    store.save()
+    assert "1" in store and "3" in store and "2" not in store
+
+def snowflake(posted_at, sequence=0):
+    return str(((posted_at * 1000 - TWITTER_EPOCH_MS) << 22) + sequence)
+
+def test_tweets_older_than_retention_stay_processed_after_restart(tmp_path, monkeypatch):
+    path = str(tmp_path / "processed_tweets.bin")
+    now = [1_800_000_000]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    pinned, older_post = snowflake(now[0] - 90 * DAY), snowflake(now[0] - DAY, 1)
+    
+    store = ProcessedTweetStore(path, retention_days=30)
+    store.add(pinned)
+    store.add(older_post)
+    store.save()
+    
+    # A restart 31 days later has forgotten both IDs, but both tweets are still on the profile
+    now[0] += 31 * DAY
+    store = ProcessedTweetStore(path, retention_days=30)
+    assert pinned not in store and older_post not in store
+    assert store.predates_retention(pinned) and store.predates_retention(older_post)
+    assert not store.predates_retention(snowflake(now[0] - 60, 2))
+    assert not store.predates_retention("not-a-status-id")
\ No newline at end of file
@@ -0,0 +1,142 @@
+import json
+import time
+import base64
+from datetime import datetime
+from config import Config
+
+def parse_timeline_response(body):
+    """Turn a UserTweets-style GraphQL response body into the scraper's tweet dictionaries"""
+    data = json.loads(body) if isinstance(body, str) else body
+    tweets = []
+    
+    for instruction in _find_instructions(data):
+        if instruction.get('type') == 'TimelinePinEntry':
+            entries, pinned = [instruction.get('entry', {})], True
+        else:
+            entries, pinned = instruction.get('entries', []), False
+        
+        for entry in entries:
+            content = entry.get('content', {})
+            # Conversation modules wrap several tweets in "items"
+            item_contents = [content.get('itemContent')] + [
+                item.get('item', {}).get('itemContent') for item in content.get('items', [])
+            ]
+            for item_content in item_contents:
+                if not item_content:
+                    continue
+                tweet = _parse_tweet_result(item_content.get('tweet_results', {}).get('result'))
+                if tweet:
+                    tweet['is_pinned'] = pinned
+                    tweets.append(tweet)
+    
+    return tweets
+
+def _find_instructions(data):
+    """Locate the timeline instructions, which sit at different depths in different timeline queries"""
+    if isinstance(data, dict):
+        if isinstance(data.get('instructions'), list):
+            return data['instructions']
+        for value in data.values():
+            instructions = _find_instructions(value)
+            if instructions:
+                return instructions
+    return []
+
+def _parse_tweet_result(result):
+    """Extract id, text, link, retweet flag, timestamp and author from one tweet result"""
+    if not result:
+        return None
+    
+    # Tweets with visibility notices nest the real tweet one level down
+    if result.get('__typename') == 'TweetWithVisibilityResults':
+        result = result.get('tweet', {})
+    
+    legacy = result.get('legacy')
+    if not legacy or not legacy.get('id_str'):
+        return None
+    
+    user = result.get('core', {}).get('user_results', {}).get('result', {})
+    author = user.get('core', {}).get('screen_name') or user.get('legacy', {}).get('screen_name', '')
+    
+    # Long posts carry their full text in a separate note
+    note = result.get('note_tweet', {}).get('note_tweet_results', {}).get('result', {})
+    if note.get('text'):
+        text = note['text']
+    else:
+        text = legacy.get('full_text', '')
+        display_range = legacy.get('display_text_range')
+        if display_range:
+            text = text[display_range[0]:display_range[1]]
+    
+    for url in legacy.get('entities', {}).get('urls', []):
+        if url.get('url') and url.get('expanded_url'):
+            text = text.replace(url['url'], url['expanded_url'])
+    
+    is_retweet = 'retweeted_status_result' in legacy or text.startswith('RT @')
+    
+    return {
+        'id': legacy['id_str'],
+        'text': text,
+        'link': f"https://x.com/{author}/status/{legacy['id_str']}",
+        'is_retweet': is_retweet,
+        'timestamp': _to_iso_timestamp(legacy.get('created_at')),
+        'author': author
+    }
+
+def _to_iso_timestamp(created_at):
+    """Convert X's created_at format to the ISO timestamp shown in the page's <time> elements"""
+    try:
+        posted = datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y")
+    except (TypeError, ValueError):
+        return None
+    return posted.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+class NetworkTimelineCapture:
+    """Reads timeline data from the GraphQL responses recorded in Chrome's performance log"""
+    
+    def __init__(self, driver):
+        self.driver = driver
+    
+    def clear(self):
+        """Discard log entries from earlier pages"""
+        try:
+            self.driver.get_log('performance')
+        except Exception:
+            pass
+    
+    def wait_for_tweets(self, timeout=None):
+        """Wait for a timeline response to finish loading and return its tweets, or None on timeout"""
+        deadline = time.monotonic() + (timeout or Config.NETWORK_CAPTURE_TIMEOUT)
+        timeline_requests = set()
+        
+        while time.monotonic() < deadline:
+            for entry in self.driver.get_log('performance'):
+                message = json.loads(entry['message'])['message']
+                params = message.get('params', {})
+                
+                if message.get('method') == 'Network.responseReceived':
+                    url = params.get('response', {}).get('url', '')
+                    if any(f"/{endpoint}" in url for endpoint in Config.NETWORK_TIMELINE_ENDPOINTS):
+                        timeline_requests.add(params['requestId'])
+                
+                elif message.get('method') == 'Network.loadingFinished':
+                    if params.get('requestId') in timeline_requests:
+                        tweets = self._read_response(params['requestId'])
+                        if tweets is not None:
+                            return tweets
+            
+            time.sleep(0.1)
+        
+        return None
+    
+    def _read_response(self, request_id):
+        """Fetch and parse a finished response body through CDP"""
+        try:
+            response = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            body = response['body']
+            if response.get('base64Encoded'):
+                body = base64.b64decode(body).decode('utf-8')
+            return parse_timeline_response(body)
+        except Exception as e:
+            print(f"⚠️ Could not read timeline response: {e}")
+            return None
\ No newline at end of file
@@ -0,0 +1,117 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from config import Config
+from twitter_scraper import READ_TWEET_FUNCTION, EXTRACT_TWEETS_SCRIPT, TwitterScraper
+
+# Installs a MutationObserver that buffers tweets X inserts into the timeline.
+# Tweets already on the page when it is armed are remembered but not buffered.
+ARM_OBSERVER_SCRIPT = READ_TWEET_FUNCTION + """
+if (window.__newsBotObserver) {
+    return false;
+}
+const root = document.querySelector('[data-testid="primaryColumn"]') || document.body;
+const seen = new Set();
+window.__newsBotBuffer = [];
+window.__newsBotLastMutation = Date.now();
+
+const collect = (node, buffer) => {
+    if (node.nodeType !== Node.ELEMENT_NODE) {
+        return;
+    }
+    const tweets = node.matches('[data-testid="tweet"]') ? [node] : node.querySelectorAll('[data-testid="tweet"]');
+    for (const tweet of tweets) {
+        const result = readTweet(tweet);
+        if (result && !seen.has(result.link)) {
+            seen.add(result.link);
+            if (buffer) {
+                window.__newsBotBuffer.push(result);
+            }
+        }
+    }
+};
+
+collect(root, false);
+window.__newsBotObserver = new MutationObserver((mutations) => {
+    window.__newsBotLastMutation = Date.now();
+    for (const mutation of mutations) {
+        for (const node of mutation.addedNodes) {
+            collect(node, true);
+        }
+    }
+});
+window.__newsBotObserver.observe(root, {childList: true, subtree: true});
+return true;
+"""
+
+# Hands over everything buffered since the last drain. Returns null if the observer is gone.
+DRAIN_BUFFER_SCRIPT = """
+if (!window.__newsBotObserver) {
+    return null;
+}
+// X holds new posts behind a "new posts" pill once the user has scrolled; reveal them
+const pill = document.querySelector('[data-testid="pillLabel"]');
+if (pill) {
+    pill.click();
+}
+return {
+    tweets: window.__newsBotBuffer.splice(0),
+    idle_ms: Date.now() - window.__newsBotLastMutation
+};
+"""
+
+class TimelineStream:
+    """Keeps one timeline open and collects new tweets as X inserts them, without reloading the page"""
+    
+    def __init__(self, driver, url, window_handle):
+        self.driver = driver
+        self.url = url
+        # The bot's X tab, which the stream takes over
+        self.window_handle = window_handle
+    
+    def open(self):
+        """Load the timeline in the Twitter tab and arm the observer. Returns the tweets already rendered"""
+        print(f"📡 Opening streaming timeline: {self.url}")
+        self.driver.switch_to.window(self.window_handle)
+        return self._load_and_arm()
+    
+    def _load_and_arm(self):
+        """(Re)load the timeline page and install a fresh observer. Returns the tweets already rendered"""
+        self.driver.get(self.url)
+        try:
+            WebDriverWait(self.driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="primaryColumn"]'))
+            )
+        except TimeoutException:
+            print("⚠️ Streaming timeline did not finish loading, arming anyway")
+        return self.arm()
+    
+    def arm(self):
+        """Install the observer unless one is already running on the page.
+        Returns the tweets rendered before arming, which the observer will not report"""
+        if not self.driver.execute_script(ARM_OBSERVER_SCRIPT):
+            return []
+        
+        print("✅ Timeline observer armed")
+        raw_tweets = self.driver.execute_script(EXTRACT_TWEETS_SCRIPT, None) or []
+        return [TwitterScraper.tweet_from_script_result(raw) for raw in raw_tweets]
+    
+    def drain(self):
+        """Return tweets inserted since the last call, re-arming the observer if it has gone or gone quiet"""
+        self.driver.switch_to.window(self.window_handle)
+        result = self.driver.execute_script(DRAIN_BUFFER_SCRIPT)
+        
+        if result is None:
+            # The page navigated or reloaded and took the observer with it
+            # Tweets rendered in the meantime are returned so none are lost
+            print("⚠️ Timeline observer missing, re-arming...")
+            return self.arm()
+        
+        tweets = [TwitterScraper.tweet_from_script_result(raw) for raw in result['tweets']]
+        
+        if result['idle_ms'] > Config.STREAM_STALE_AFTER * 1000:
+            print(f"⚠️ No timeline updates for {result['idle_ms'] / 1000:.0f}s, reloading the stream...")
+            tweets += self._load_and_arm()
+        
+        return tweets
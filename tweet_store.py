@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import struct
+import hashlib
+
+# Each record is a tweet ID (unsigned 64-bit) and the unix time it was first processed
+RECORD = struct.Struct("<QI")
+ID_MASK = (1 << 64) - 1
+# Status IDs start with the milliseconds since X's epoch, above 22 bits of worker and sequence numbers
+TWITTER_EPOCH_MS = 1288834974657
+
+def status_time(tweet_id):
+    """Unix time a tweet was posted, read from its status ID, or None if the ID is not a status ID"""
+    try:
+        return ((int(tweet_id) >> 22) + TWITTER_EPOCH_MS) / 1000
+    except (TypeError, ValueError):
+        return None
+
+class ProcessedTweetStore:
+    """Append-only record of processed tweet IDs that forgets entries older than the retention window"""
+    
+    def __init__(self, path, retention_days, legacy_json_path=None):
+        self.path = path
+        self.retention_seconds = int(retention_days * 24 * 60 * 60)
+        # Kept in timestamp order, oldest first, so expiry only looks at the front
+        self.seen = {}
+        self.newest = 0
+        self.pending = []
+        self.expired_on_disk = 0
+        
+        if legacy_json_path and not os.path.exists(path) and os.path.exists(legacy_json_path):
+            self._migrate_json(legacy_json_path)
+        else:
+            self._load()
+    
+    @staticmethod
+    def _to_int(tweet_id):
+        """Tweet IDs are numeric status IDs; anything else is hashed into the same 64-bit space"""
+        try:
+            return int(tweet_id) & ID_MASK
+        except (TypeError, ValueError):
+            digest = hashlib.blake2b(str(tweet_id).encode('utf-8'), digest_size=8).digest()
+            return int.from_bytes(digest, 'little')
+    
+    def __contains__(self, tweet_id):
+        return self._to_int(tweet_id) in self.seen
+    
+    def __len__(self):
+        return len(self.seen)
+    
+    def predates_retention(self, tweet_id):
+        """Check whether a tweet was posted before the retention window. Its ID may already be forgotten,
+        so such a tweet still on a profile, like a pinned one, must not be taken for a new one"""
+        posted_at = status_time(tweet_id)
+        return posted_at is not None and posted_at < time.time() - self.retention_seconds
+    
+    def add(self, tweet_id):
+        """Mark a tweet as processed. Written to disk on the next save()"""
+        key = self._to_int(tweet_id)
+        if key not in self.seen:
+            # A clock stepping back must not put a newer ID ahead of older ones
+            now = max(int(time.time()), self.newest)
+            self.newest = now
+            self.seen[key] = now
+            self.pending.append((key, now))
+    
+    def save(self):
+        """Append IDs added since the last save, compacting the file once it is mostly expired"""
+        self._expire()
+        
+        if self.expired_on_disk > len(self.seen):
+            self._compact()
+            return
+        
+        if not self.pending:
+            return
+        
+        with open(self.path, 'ab') as f:
+            f.write(b''.join(RECORD.pack(key, added_at) for key, added_at in self.pending))
+        self.pending = []
+    
+    def _load(self):
+        """Read the store, skipping entries that are past the retention window"""
+        if not os.path.exists(self.path):
+            return
+        
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            print(f"⚠️ Could not load {self.path}: {e}")
+            print("Starting with fresh tweet tracking...")
+            return
+        
+        # Ignore a partial record left by an interrupted write
+        usable = len(data) - len(data) % RECORD.size
+        cutoff = int(time.time()) - self.retention_seconds
+        for key, added_at in RECORD.iter_unpack(data[:usable]):
+            if added_at >= cutoff:
+                self.seen[key] = added_at
+            else:
+                self.expired_on_disk += 1
+        
+        # Records are appended in time order unless the clock stepped back while they were written
+        added = list(self.seen.values())
+        if any(later < earlier for earlier, later in zip(added, added[1:])):
+            self.seen = dict(sorted(self.seen.items(), key=lambda item: item[1]))
+        self.newest = max(added, default=0)
+        
+        print(f"📂 Loaded {len(self.seen)} processed tweet IDs from {self.path}")
+    
+    def _migrate_json(self, legacy_json_path):
+        """Import the old processed_tweets.json set once and rewrite it in the compact format"""
+        print(f"🔄 Migrating {legacy_json_path} to {self.path}...")
+        
+        try:
+            with open(legacy_json_path, 'r') as f:
+                content = f.read().strip()
+            tweet_ids = json.loads(content) if content else []
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"⚠️ Could not migrate {legacy_json_path}: {e}")
+            tweet_ids = []
+        
+        # The old file has no timestamps, so migrated IDs start their retention window now
+        now = int(time.time())
+        for tweet_id in tweet_ids:
+            self.seen[self._to_int(tweet_id)] = now
+        self.newest = now
+        
+        self._compact()
+        os.replace(legacy_json_path, f"{legacy_json_path}.migrated")
+        print(f"✅ Migrated {len(self.seen)} processed tweet IDs")
+    
+    def _expire(self):
+        """Forget IDs that are older than the retention window"""
+        cutoff = int(time.time()) - self.retention_seconds
+        
+        # IDs are kept oldest first, so only the oldest few need checking
+        expired = []
+        for key, added_at in self.seen.items():
+            if added_at >= cutoff:
+                break
+            expired.append(key)
+        
+        for key in expired:
+            del self.seen[key]
+        self.expired_on_disk += len(expired)
+    
+    def _compact(self):
+        """Rewrite the file with only live entries"""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(b''.join(RECORD.pack(key, added_at) for key, added_at in self.seen.items()))
+        os.replace(temp_path, self.path)
+        
+        self.pending = []
+        self.expired_on_disk = 0
\ No newline at end of file
@@ -1,14 +1,122 @@
 import time
-import re
+import threading
+from urllib.parse import quote
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from config import Config
+from timeline_network import NetworkTimelineCapture
+from metrics import metrics
+
+# Reads one rendered tweet element, or returns null if it has no text or status link.
+# Shared by the bulk extraction script and the streaming observer.
+READ_TWEET_FUNCTION = """
+function readTweet(tweet) {
+    const textElement = tweet.querySelector('[data-testid="tweetText"]');
+    const linkElement = tweet.querySelector('a[href*="/status/"]');
+    if (!textElement || !linkElement) {
+        return null;
+    }
+    const text = textElement.innerText;
+    let isRetweet = text.startsWith('RT @');
+    let isPinned = false;
+    for (const indicator of tweet.querySelectorAll('[data-testid="socialContext"]')) {
+        const label = indicator.innerText.toLowerCase();
+        if (label.includes('retweeted') || label.includes('reposted')) {
+            isRetweet = true;
+        }
+        if (label.includes('pinned')) {
+            isPinned = true;
+        }
+    }
+    const timeElement = tweet.querySelector('time');
+    return {
+        text: text,
+        link: linkElement.href,
+        author: new URL(linkElement.href).pathname.split('/')[1],
+        is_retweet: isRetweet,
+        is_pinned: isPinned,
+        timestamp: timeElement ? timeElement.getAttribute('datetime') : null
+    };
+}
+"""
+
+# Collects every rendered tweet in one round-trip. Mirrors the per-element path:
+# tweets without text or a status link are skipped, and the retweet checks match _is_retweet.
+# When a since ID is passed, extraction stops after the first original, unpinned tweet
+# that is not newer than it, so the caller can tell it has caught up.
+EXTRACT_TWEETS_SCRIPT = READ_TWEET_FUNCTION + """
+const sinceId = arguments[0] ? BigInt(arguments[0]) : null;
+const results = [];
+for (const tweet of document.querySelectorAll('[data-testid="tweet"]')) {
+    const result = readTweet(tweet);
+    if (!result) {
+        continue;
+    }
+    results.push(result);
+    const statusId = result.link.split('/').pop();
+    if (sinceId !== null && !result.is_retweet && !result.is_pinned && /^\\d+$/.test(statusId) && BigInt(statusId) <= sinceId) {
+        break;
+    }
+}
+return results;
+"""
+
+LAST_TWEET_LINK_SCRIPT = """
+const tweets = document.querySelectorAll('[data-testid="tweet"]');
+const last = tweets[tweets.length - 1];
+const link = last ? last.querySelector('a[href*="/status/"]') : null;
+return link ? link.href : null;
+"""
+
+def build_search_url(usernames):
+    """Latest-first search URL for tweets from any of the given accounts"""
+    query = " OR ".join(f"from:{username}" for username in usernames)
+    return f"https://x.com/search?q={quote(f'({query})')}&src=typed_query&f=live"
+
+class AccountState:
+    """What has been seen on each profile. A scraper pool shares one, so whichever browser checks
+    an account next stops where the previous check did"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Newest status ID seen on each profile, so later checks can stop at it
+        self.newest_seen_ids = {}
+        # Recent original posts per profile (status ID -> timestamp), used for post-rate estimates
+        self.recent_posts = {}
+        self.last_post_times = {}
 
 class TwitterScraper:
-    def __init__(self, driver):
+    def __init__(self, driver, account_state=None):
         self.driver = driver
+        self.account_state = account_state or AccountState()
+        self.newest_seen_ids = self.account_state.newest_seen_ids
+        self.recent_posts = self.account_state.recent_posts
+        self.last_post_times = self.account_state.last_post_times
+        # Newest status ID seen on each combined timeline (search or List URL), across all its accounts
+        self.aggregate_seen_ids = {}
+        self.network_capture = NetworkTimelineCapture(driver) if Config.EXTRACTION_BACKEND == "network" else None
+        self.login_page_seconds = None
+        self._block_resources()
+    
+    def set_driver(self, driver):
+        """Point the scraper at a replacement browser, keeping its per-account state"""
+        self.driver = driver
+        if self.network_capture:
+            self.network_capture.driver = driver
+        self._block_resources()
+    
+    def _block_resources(self):
+        """Stop the current tab, which the scraper keeps on X, from downloading media and fonts it never reads.
+        Blocking applies to this tab only, so a WhatsApp tab opened later is unaffected"""
+        if not Config.BLOCKED_URL_PATTERNS:
+            return
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": Config.BLOCKED_URL_PATTERNS})
+        except WebDriverException as e:
+            print(f"⚠️ Could not block media on the X tab: {e}")
     
     def login(self):
         """Navigate to Twitter - manual login required on first run"""
@@ -17,7 +125,9 @@ class TwitterScraper:
         print(f"🔗 Navigating to: {login_url}")
         
         try:
+            started = time.perf_counter()
             self.driver.get(login_url)
+            self.login_page_seconds = time.perf_counter() - started
             print("✅ Successfully navigated to X.com login page")
         except Exception as e:
             print(f"❌ Failed to navigate to X.com: {e}")
@@ -36,63 +146,336 @@ class TwitterScraper:
             print("❌ Failed to detect X.com login. Please ensure you're logged in.")
             print("💡 Make sure you can see your timeline/home feed")
     
+    def resume_session(self, snapshot):
+        """Log back into X without prompts: the profile's own session first, then the saved snapshot.
+        Returns False if manual login is still needed"""
+        home_url = "https://x.com/home"
+        self.driver.get(home_url)
+        if self._home_loaded():
+            print("✅ X session still valid")
+            return True
+        
+        if not snapshot.restore(self.driver):
+            return False
+        self.driver.get(home_url)
+        if self._home_loaded():
+            print("✅ X session restored from snapshot")
+            return True
+        return False
+    
+    def _home_loaded(self):
+        """Check that the logged-in home timeline rendered rather than a login page"""
+        try:
+            WebDriverWait(self.driver, Config.SESSION_RESTORE_TIMEOUT).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="primaryColumn"]'))
+            )
+        except TimeoutException:
+            return False
+        return "/login" not in self.driver.current_url and "/i/flow" not in self.driver.current_url
+    
     def check_account_tweets(self, username):
         """Check recent tweets from a specific account"""
         print(f"Checking tweets from @{username}...")
         
+        since_id = self.newest_seen_ids.get(username)
+        if self.network_capture:
+            self.network_capture.clear()
+        
         # Navigate to user profile
-        self.driver.get(f"https://x.com/{username}")
+        with metrics.timer("page_load"):
+            self.driver.get(f"https://x.com/{username}")
+        metrics.inc("page_loads_total", kind="profile")
+        
+        with metrics.timer("extraction", backend=Config.EXTRACTION_BACKEND):
+            tweets = self._network_tweets(username, since_id) if self.network_capture else None
+            
+            if tweets is None:
+                try:
+                    # Wait for tweets to load
+                    WebDriverWait(self.driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweet"]'))
+                    )
+                except TimeoutException:
+                    print(f"Could not load tweets for @{username}")
+                    self.last_post_times.pop(username, None)
+                    metrics.inc("page_load_failures_total")
+                    return []
+                
+                tweets = self._collect_new_tweets(f"@{username}", since_id)
+        
+        return self.select_relevant_tweets(username, tweets)
+    
+    def check_aggregated_timeline(self, url, usernames):
+        """Check several accounts from one timeline that combines them, such as an X List or a from: search.
+        Returns each account's relevant new tweets, or None if the timeline did not load"""
+        print(f"Checking {len(usernames)} accounts on one timeline...")
+        
+        since_id = self.aggregate_seen_ids.get(url)
+        with metrics.timer("page_load"):
+            self.driver.get(url)
+        metrics.inc("page_loads_total", kind="aggregate")
+        
+        # Timeline responses are only captured for profiles, so combined timelines are read from the page
+        backend = "bulk" if Config.EXTRACTION_BACKEND == "network" else Config.EXTRACTION_BACKEND
+        with metrics.timer("extraction", backend=backend):
+            try:
+                WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweet"]'))
+                )
+            except TimeoutException:
+                print("Could not load tweets on the combined timeline")
+                metrics.inc("page_load_failures_total")
+                return None
+            
+            # Search can list a tweet only after newer ones from other accounts, so the scan reaches back
+            # AGGREGATE_INDEX_LAG seconds of status ID time past the newest tweet seen, and each account's
+            # own since ID below drops what was seen before
+            scan_to = since_id - (Config.AGGREGATE_INDEX_LAG * 1000 << 22) if since_id else None
+            tweets = self._collect_new_tweets("the combined timeline", scan_to)
+        
+        status_ids = [self._status_id(tweet) for tweet in tweets if not tweet['is_retweet']]
+        status_ids = [status_id for status_id in status_ids if status_id is not None]
+        if status_ids:
+            self.aggregate_seen_ids[url] = max(status_ids + [since_id or 0])
+        
+        # Profile checks in between may already have handled some of these tweets
+        return {
+            username: self.select_relevant_tweets(username, account_tweets)
+            for username, account_tweets in self.new_tweets_by_author(tweets, usernames).items()
+        }
+    
+    def new_tweets_by_author(self, tweets, usernames):
+        """Split tweets from a timeline that combines accounts by the monitored account that posted them,
+        keeping only those newer than that account's since ID"""
+        monitored = {username.lower(): username for username in usernames}
+        tweets_by_account = {username: [] for username in usernames}
+        for tweet in tweets:
+            username = monitored.get((tweet['author'] or '').lower())
+            if username:
+                tweets_by_account[username].append(tweet)
+        
+        return {
+            username: self.newer_than_seen(username, account_tweets)
+            for username, account_tweets in tweets_by_account.items()
+        }
+    
+    def select_relevant_tweets(self, username, tweets):
+        """Record an account's newly extracted tweets and keep the original ones that pass its filters"""
+        with metrics.timer("filtering"):
+            return self._select_relevant_tweets(username, tweets)
+    
+    def _select_relevant_tweets(self, username, tweets):
+        """Filter tweets with the account's rules, skipping retweets"""
+        new_arsenal_tweets = []
+        self._remember_posts(username, tweets)
+        metrics.inc("tweets_seen_total", len(tweets), account=username)
+        
+        for tweet in tweets:
+            if tweet['is_retweet']:
+                print(f"⏭️ Skipping retweet from @{username}")
+                metrics.inc("tweets_filtered_total", reason="retweet")
+                continue
+            
+            # Check if should include tweet
+            if not self._should_include_tweet(username, tweet['text']):
+                metrics.inc("tweets_filtered_total", reason="rules")
+                continue
+            
+            new_arsenal_tweets.append({
+                'id': tweet['id'],
+                'text': tweet['text'],
+                'link': tweet['link'],
+                'timestamp': tweet['timestamp'],
+                'username': username,
+                'scraped_at': time.time()
+            })
+            print(f"📝 Found relevant tweet from @{username}")
+        
+        return new_arsenal_tweets
+    
+    def _network_tweets(self, username, since_id):
+        """Read new tweets from the profile's timeline response. Returns None to fall back to the page"""
+        tweets = self.network_capture.wait_for_tweets()
+        if tweets is None:
+            print(f"⚠️ No timeline response captured for @{username}, reading the page instead")
+            return None
+        
+        # The profile timeline can include other accounts' tweets in conversation modules
+        tweets = [tweet for tweet in tweets if tweet['author'].lower() == username.lower()]
+        
+        new_tweets, caught_up = self._take_until_seen(tweets, since_id)
+        if since_id is not None and not caught_up:
+            print(f"📜 Timeline response for @{username} has no seen tweets, catching up on the page...")
+            return None
         
+        return new_tweets
+    
+    def _collect_new_tweets(self, source, since_id):
+        """Extract tweets newer than since_id, scrolling down while the whole visible window is new"""
+        collected = {}
+        
+        for scroll in range(Config.CATCHUP_MAX_SCROLLS + 1):
+            new_tweets, caught_up = self._take_until_seen(self.extract_tweets(since_id), since_id)
+            for tweet in new_tweets:
+                collected.setdefault(tweet['id'], tweet)
+            
+            # Without a since ID this is the first check, and the visible window is enough
+            if caught_up or since_id is None:
+                break
+            
+            if scroll == Config.CATCHUP_MAX_SCROLLS:
+                print(f"⚠️ Still not caught up with {source} after {scroll} scrolls, some tweets may be missed")
+            else:
+                print(f"📜 Every visible tweet on {source} is new, scrolling to catch up...")
+                if not self._scroll_timeline():
+                    break
+        
+        return list(collected.values())
+    
+    @staticmethod
+    def _status_id(tweet):
+        """Numeric status ID of an extracted tweet, or None"""
         try:
-            # Wait for tweets to load
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweet"]'))
+            return int(tweet['id'])
+        except (TypeError, ValueError):
+            return None
+    
+    def newer_than_seen(self, username, tweets):
+        """Drop tweets that are not newer than the account's newest seen status ID"""
+        since_id = self.newest_seen_ids.get(username)
+        if since_id is None:
+            return tweets
+        return [tweet for tweet in tweets if (self._status_id(tweet) or since_id + 1) > since_id]
+    
+    def _take_until_seen(self, tweets, since_id):
+        """Keep tweets newer than since_id. Also reports whether an already-seen original tweet was reached"""
+        if since_id is None:
+            return tweets, False
+        
+        new_tweets = []
+        for tweet in tweets:
+            status_id = self._status_id(tweet)
+            if status_id is not None and status_id <= since_id:
+                # Pinned tweets and retweets of older posts sit out of order, so they don't end the scan
+                if not tweet['is_pinned'] and not tweet['is_retweet']:
+                    return new_tweets, True
+                continue
+            new_tweets.append(tweet)
+        
+        return new_tweets, False
+    
+    def _scroll_timeline(self):
+        """Scroll further down the timeline. Returns False if no more tweets render"""
+        last_link = self.driver.execute_script(LAST_TWEET_LINK_SCRIPT)
+        self.driver.execute_script("window.scrollBy(0, window.innerHeight * 2);")
+        
+        try:
+            WebDriverWait(self.driver, 5).until(
+                lambda driver: driver.execute_script(LAST_TWEET_LINK_SCRIPT) != last_link
             )
+            return True
+        except TimeoutException:
+            return False
+    
+    def _remember_posts(self, username, tweets):
+        """Advance the account's since ID and keep recent post timestamps for rate estimates"""
+        status_ids = [self._status_id(tweet) for tweet in tweets if not tweet['is_retweet']]
+        status_ids = [status_id for status_id in status_ids if status_id is not None]
+        
+        with self.account_state.lock:
+            if status_ids:
+                self.newest_seen_ids[username] = max(status_ids + [self.newest_seen_ids.get(username, 0)])
             
-            # Get recent tweets
-            tweets = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweet"]')[:5]
+            recent = self.recent_posts.setdefault(username, {})
+            for tweet in tweets:
+                if tweet['timestamp'] and not tweet['is_retweet']:
+                    recent[tweet['id']] = tweet['timestamp']
             
-            new_arsenal_tweets = []
+            # Keep only the newest posts
+            for tweet_id in sorted(recent, key=recent.get)[:-Config.RECENT_POSTS_PER_ACCOUNT]:
+                del recent[tweet_id]
             
-            for tweet in tweets:
+            self.last_post_times[username] = list(recent.values())
+    
+    def extract_tweets(self, since_id=None):
+        """Extract tweets on the current page using the configured backend, stopping at since_id if given"""
+        if Config.EXTRACTION_BACKEND != "element":
+            try:
+                return self._extract_tweets_bulk(since_id)
+            except WebDriverException as e:
+                print(f"⚠️ Bulk extraction failed, falling back to per-element lookups: {e}")
+        
+        return self._extract_tweets_per_element(since_id)
+    
+    def _extract_tweets_bulk(self, since_id=None):
+        """Extract all tweets on the page with a single injected script"""
+        raw_tweets = self.driver.execute_script(
+            EXTRACT_TWEETS_SCRIPT, str(since_id) if since_id else None
+        ) or []
+        return [self.tweet_from_script_result(raw) for raw in raw_tweets]
+    
+    @staticmethod
+    def tweet_from_script_result(raw):
+        """Convert a tweet returned by readTweet() into the scraper's tweet dictionary"""
+        tweet_link = raw.get('link')
+        tweet_text = raw.get('text') or ''
+        return {
+            'id': tweet_link.split('/')[-1] if tweet_link else hash(tweet_text),
+            'text': tweet_text,
+            'link': tweet_link,
+            'author': raw.get('author'),
+            'is_retweet': bool(raw.get('is_retweet')),
+            'is_pinned': bool(raw.get('is_pinned')),
+            'timestamp': raw.get('timestamp')
+        }
+    
+    def _extract_tweets_per_element(self, since_id=None, limit=5):
+        """Extract recent tweets with one WebDriver lookup per field"""
+        tweet_elements = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweet"]')
+        # With a since ID the scan ends at the first seen tweet instead of a fixed count
+        if since_id is None:
+            tweet_elements = tweet_elements[:limit]
+        
+        tweets = []
+        for tweet in tweet_elements:
+            try:
+                # Check if this is a retweet
+                is_retweet = self._is_retweet(tweet)
+                is_pinned = self._is_pinned(tweet)
+                
+                # Get tweet text and link
+                tweet_text_element = tweet.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]')
+                tweet_text = tweet_text_element.text
+                
+                tweet_link_element = tweet.find_element(By.CSS_SELECTOR, 'a[href*="/status/"]')
+                tweet_link = tweet_link_element.get_attribute('href')
+                
                 try:
-                    # Check if this is a retweet
-                    is_retweet = self._is_retweet(tweet)
-                    
-                    if is_retweet:
-                        print(f"⏭️ Skipping retweet from @{username}")
-                        continue
-                    
-                    # Get tweet text and link
-                    tweet_text_element = tweet.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]')
-                    tweet_text = tweet_text_element.text
-                    
-                    tweet_link_element = tweet.find_element(By.CSS_SELECTOR, 'a[href*="/status/"]')
-                    tweet_link = tweet_link_element.get_attribute('href')
-                    
-                    # Create unique tweet ID
-                    tweet_id = tweet_link.split('/')[-1] if tweet_link else hash(tweet_text)
-                    
-                    # Check if should include tweet
-                    should_include = self._should_include_tweet(username, tweet_text)
-                    
-                    if should_include:
-                        new_arsenal_tweets.append({
-                            'id': tweet_id,
-                            'text': tweet_text,
-                            'link': tweet_link,
-                            'username': username
-                        })
-                        print(f"📝 Found relevant tweet from @{username}")
+                    timestamp = tweet.find_element(By.TAG_NAME, 'time').get_attribute('datetime')
+                except NoSuchElementException:
+                    timestamp = None
                 
-                except (NoSuchElementException, Exception) as e:
-                    continue
+                # Create unique tweet ID
+                tweet_id = tweet_link.split('/')[-1] if tweet_link else hash(tweet_text)
+                
+                tweets.append({
+                    'id': tweet_id,
+                    'text': tweet_text,
+                    'link': tweet_link,
+                    'author': tweet_link.split('/')[3] if tweet_link else None,
+                    'is_retweet': is_retweet,
+                    'is_pinned': is_pinned,
+                    'timestamp': timestamp
+                })
             
-            return new_arsenal_tweets
+            except (NoSuchElementException, Exception) as e:
+                continue
             
-        except TimeoutException:
-            print(f"Could not load tweets for @{username}")
-            return []
+            # Stop after the first already-seen original tweet, like the bulk script
+            if self._take_until_seen(tweets[-1:], since_id)[1]:
+                break
+        
+        return tweets
     
     def _is_retweet(self, tweet):
         """Check if this is a retweet"""
@@ -119,35 +502,16 @@ class TwitterScraper:
         
         return is_retweet
     
-    def _contains_keywords(self, text):
-        """
-        Check if text contains related keywords with precise matching.
-        Prevents false positives like #AFC matching #AFCB.
-        """
-        text_lower = text.lower()
-        
-        for keyword in Config.KEYWORDS:
-            keyword_lower = keyword.lower()
-            
-            if keyword.startswith('#'):
-                # For hashtags, ensure it's followed by space, punctuation, or end of string
-                # This prevents #AFC from matching #AFCB
-                pattern = re.escape(keyword_lower) + r'(?=\s|[^\w]|$)'
-                if re.search(pattern, text_lower):
-                    return True
-            else:
-                # For regular words, use word boundaries
-                pattern = r'\b' + re.escape(keyword_lower) + r'\b'
-                if re.search(pattern, text_lower):
+    def _is_pinned(self, tweet):
+        """Check if this is the profile's pinned tweet"""
+        try:
+            for indicator in tweet.find_elements(By.CSS_SELECTOR, '[data-testid="socialContext"]'):
+                if "pinned" in indicator.text.lower():
                     return True
-        
+        except:
+            pass
         return False
     
     def _should_include_tweet(self, username, tweet_text):
-        """Determine if tweet should be included based on filtering rules"""
-        if username == "HandofArsenal":
-            # Include ALL original tweets from HandofArsenal
-            return True
-        else:
-            # For other accounts, check for Arsenal keywords with precise matching
-            return self._contains_keywords(tweet_text)
\ No newline at end of file
+        """Determine if tweet should be included based on the account's filtering rules"""
+        return Config.RULES.should_include(username, tweet_text)
\ No newline at end of file
@@ -1,18 +1,81 @@
 import time
 import re
+from collections import defaultdict, deque
+from datetime import datetime
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 from config import Config
+from metrics import metrics
+
+# Readiness signals used instead of fixed sleeps. WhatsApp changes its markup
+# regularly, so each signal accepts several selectors.
+CHAT_LIST_SELECTORS = ['[data-testid="chat-list"]', '[data-testid="chats-list"]', '#pane-side']
+LINK_PREVIEW_SELECTORS = [
+    'footer [data-testid="link-preview"]',
+    'footer [data-testid="media-url-provider"]',
+    'footer [data-testid="compose-box"] img',
+]
+SEARCH_BOX_SELECTORS = [
+    '#side div[contenteditable="true"][data-tab="3"]',
+    '#side [data-testid="chat-list-search"]',
+    '#side div[contenteditable="true"]',
+]
+OUTGOING_MESSAGE_SELECTOR = 'div.message-out'
+SENT_TICK_SELECTORS = ['[data-icon="msg-check"]', '[data-icon="msg-dblcheck"]', '[data-icon="msg-dblcheck-ack"]']
+
+# Title of the conversation open in the main pane, in one round-trip
+OPEN_CHAT_TITLE_SCRIPT = """
+const title = document.querySelector('#main header span[title]');
+return title ? title.getAttribute('title') : null;
+"""
+
+# Text of the newest outgoing messages in the open chat, in one round-trip
+RECENT_OUTGOING_SCRIPT = """
+const bubbles = Array.from(document.querySelectorAll(arguments[0]));
+return bubbles.slice(-arguments[1]).map((bubble) => bubble.innerText);
+"""
+
+# How many of our latest messages are searched when checking whether a message already went out
+RECENT_OUTGOING_COUNT = 20
+
+# Replaces the compose box contents with the whole message in one round-trip. WhatsApp's editor
+# handles the synthetic paste itself (and cancels it), keeping emoji and turning line breaks into
+# Shift+Enter breaks. If nothing handles it, the text is inserted as if typed.
+PASTE_TEXT_SCRIPT = """
+const box = arguments[0];
+const text = arguments[1];
+box.focus();
+window.getSelection().selectAllChildren(box);
+const data = new DataTransfer();
+data.setData('text/plain', text);
+const unhandled = box.dispatchEvent(new ClipboardEvent('paste', {clipboardData: data, bubbles: true, cancelable: true}));
+if (unhandled) {
+    document.execCommand('insertText', false, text);
+}
+return box.innerText;
+"""
+
+def parse_timestamp(timestamp):
+    """Unix time of an ISO timestamp such as the datetime attribute of X's <time> elements"""
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
 
 class WhatsAppSender:
     def __init__(self, driver):
         self.driver = driver
+        # Recent durations of each readiness wait, in seconds
+        self.wait_timings = defaultdict(lambda: deque(maxlen=100))
+        # WhatsApp's tab, remembered when it is opened so sending never depends on tab order
+        self.window_handle = None
     
     def setup(self):
         """Open WhatsApp Web in a new tab"""
         print("Opening WhatsApp Web...")
-        self.driver.execute_script(f"window.open('{Config.WHATSAPP_URL}', '_blank');")
-        self.driver.switch_to.window(self.driver.window_handles[-1])
+        self._open_tab()
         
         # Wait for manual WhatsApp Web login
         input("Please scan QR code to login to WhatsApp Web and press Enter when done...")
@@ -35,7 +98,7 @@ class WhatsAppSender:
                 attempt += 1
                 print(f"⏳ Loading WhatsApp... (attempt {attempt}/{max_attempts})")
                 time.sleep(2)
-                
+            
             except Exception as e:
                 attempt += 1
                 print(f"⏳ Waiting for WhatsApp to load... (attempt {attempt}/{max_attempts})")
@@ -43,24 +106,136 @@ class WhatsAppSender:
         
         print("⚠️ WhatsApp may not be fully loaded, but continuing anyway...")
     
-    def send_tweet(self, tweet_data):
-        """Send tweet information to WhatsApp group"""
-        print(f"Sending tweet from @{tweet_data['username']} to WhatsApp...")
+    def resume_session(self, snapshot, return_handle):
+        """Open WhatsApp Web without prompts: the profile's own session first, then the saved snapshot.
+        Returns False, closing the tab again and switching to return_handle, if the QR code still has to be scanned"""
+        self._open_tab()
+        if self._chat_list_loaded():
+            print("✅ WhatsApp session still valid")
+            return True
+        
+        if snapshot.restore(self.driver):
+            self.driver.refresh()
+            if self._chat_list_loaded():
+                print("✅ WhatsApp session restored from snapshot")
+                return True
         
+        self.driver.close()
+        self.window_handle = None
+        self.driver.switch_to.window(return_handle)
+        return False
+    
+    def _open_tab(self):
+        """Open WhatsApp Web in a new tab, switch to it and remember its handle"""
+        self.driver.switch_to.new_window('tab')
+        self.window_handle = self.driver.current_window_handle
+        self.driver.get(Config.WHATSAPP_URL)
+    
+    def activate(self):
+        """Switch to the WhatsApp tab"""
+        self.driver.switch_to.window(self.window_handle)
+    
+    def _chat_list_loaded(self):
+        """Wait for the chat list, which only shows once WhatsApp Web is logged in"""
         try:
-            # Clean the tweet text
-            clean_tweet_text = self._clean_text_for_chrome(tweet_data['text'])
-            
-            # Wait a bit for WhatsApp to be stable
-            time.sleep(3)
+            WebDriverWait(self.driver, Config.SESSION_RESTORE_TIMEOUT).until(self._any_present(CHAT_LIST_SELECTORS))
+            return True
+        except TimeoutException:
+            return False
+    
+    def send(self, message, check_chat=False):
+        """Send either a single tweet or a digest built by TweetCoalescer. Returns True once WhatsApp confirms it.
+        With check_chat, anything already among our recent messages in the group is not sent again"""
+        tweets = message.get('tweets', [message])
+        
+        with metrics.timer("send"):
+            if 'parts' in message:
+                sent = self.send_digest(message, check_chat)
+            else:
+                sent = self.send_tweet(message, check_chat)
+        
+        if not sent:
+            metrics.inc("send_failures_total", len(tweets))
+            return False
+        
+        metrics.inc("tweets_sent_total", len(tweets))
+        for tweet in tweets:
+            # Time from the tweet appearing on X to it landing in the group
+            posted_at = parse_timestamp(tweet.get('timestamp'))
+            if posted_at:
+                metrics.observe("tweet_end_to_end_seconds", time.time() - posted_at, account=tweet['username'])
+            if tweet.get('scraped_at'):
+                metrics.observe("tweet_scrape_to_send_seconds", time.time() - tweet['scraped_at'])
+        return True
+    
+    def send_digest(self, digest, check_chat=False):
+        """Send several tweets as one message per part, one line per tweet. Returns True once every part is confirmed"""
+        print(f"Sending digest of {len(digest['tweets'])} tweets from @{digest['username']} to WhatsApp...")
+        
+        try:
+            if not self._find_and_click_group():
+                return False
             
-            # Find and click the group
+            confirmed = True
+            for lines, links in zip(digest['parts'], digest['part_links']):
+                # A retry only sends the parts that did not make it the first time
+                if check_chat and self._already_in_chat(links[-1]):
+                    print("✅ Digest part is already in the group, not sending it again")
+                    continue
+                lines = [self._format_text(line, single_line=True) for line in lines]
+                confirmed = self._send_lines(lines, links[-1]) and confirmed
+            self._print_wait_timings()
+            return confirmed
+        
+        except Exception as e:
+            print(f"❌ Failed to send digest to WhatsApp: {str(e)}")
+            try:
+                self.driver.save_screenshot("whatsapp_error.png")
+                print("📸 Screenshot saved as 'whatsapp_error.png' for debugging")
+            except:
+                pass
+            return False
+    
+    def _send_lines(self, lines, last_link):
+        """Compose lines separated by line breaks and send them as one message.
+        Returns True once a message with the last tweet's link shows a sent tick"""
+        message_box = self.driver.find_element(
+            By.XPATH, "//div[@contenteditable='true' and @data-tab='10']"
+        )
+        message_box.click()
+        self._wait_for("focus", lambda driver: driver.switch_to.active_element == message_box)
+        message_box.clear()
+        
+        with metrics.timer("typing", method=Config.WHATSAPP_COMPOSE_METHOD):
+            self._compose(message_box, Config.MESSAGE_PREFIX + "\n".join(lines))
+        
+        # Digests carry several links, so they go out without waiting for a preview
+        message_box.send_keys(Keys.ENTER)
+        
+        if self._wait_for("sent", self._message_sent(last_link)):
+            print(f"✅ Digest sent to {Config.WHATSAPP_GROUP_NAME} group!")
+            return True
+        print(f"⚠️ Digest submitted to {Config.WHATSAPP_GROUP_NAME} but no sent tick seen yet")
+        return False
+    
+    def send_tweet(self, tweet_data, check_chat=False):
+        """Send tweet information to WhatsApp group. Returns True once the message shows a sent tick"""
+        print(f"Sending tweet from @{tweet_data['username']} to WhatsApp...")
+        
+        try:
+            # Find and click the group, unless it is still open from the last message
             if not self._find_and_click_group():
-                return
+                return False
             
-            # Send the message
-            self._send_message(clean_tweet_text, tweet_data['link'])
+            if check_chat and self._already_in_chat(tweet_data['link']):
+                print(f"✅ Tweet from @{tweet_data['username']} is already in the group, not sending it again")
+                return True
             
+            # Send the message
+            sent = self._send_message(tweet_data['text'], tweet_data['link'])
+            self._print_wait_timings()
+            return sent
+        
         except Exception as e:
             print(f"❌ Failed to send to WhatsApp: {str(e)}")
             # Take a screenshot for debugging
@@ -69,9 +244,53 @@ class WhatsAppSender:
                 print("📸 Screenshot saved as 'whatsapp_error.png' for debugging")
             except:
                 pass
+            return False
     
     def _find_and_click_group(self):
-        """Find and click the WhatsApp group"""
+        """Make sure the group is the open chat, searching for it only when another chat is open"""
+        with metrics.timer("group_lookup", path="already_open"):
+            already_open = self._chat_header_matches(self.driver)
+        if already_open:
+            return True
+        
+        # Wait for the chat list instead of a fixed pause. If it never shows, the search below fails fast
+        self._wait_for("ready", self._any_present(CHAT_LIST_SELECTORS))
+        
+        with metrics.timer("group_lookup", path="search"):
+            found = self._search_group()
+        if found:
+            return True
+        
+        with metrics.timer("group_lookup", path="chat_list"):
+            return self._click_group()
+    
+    def _search_group(self):
+        """Open the group through WhatsApp's search box, which finds it even when it is far down the chat list"""
+        for selector in SEARCH_BOX_SELECTORS:
+            boxes = self.driver.find_elements(By.CSS_SELECTOR, selector)
+            if boxes:
+                break
+        else:
+            print("⚠️ WhatsApp search box not found, looking through the chat list instead")
+            return False
+        
+        boxes[0].click()
+        self.driver.execute_script(PASTE_TEXT_SCRIPT, boxes[0], Config.WHATSAPP_GROUP_NAME)
+        
+        escaped_name = Config.WHATSAPP_GROUP_NAME.replace('\\', '\\\\').replace('"', '\\"')
+        result_selector = f'#pane-side span[title="{escaped_name}"]'
+        if not self._wait_for("search", self._any_present([result_selector])):
+            print(f"⚠️ Search did not find {Config.WHATSAPP_GROUP_NAME}, looking through the chat list instead")
+            return False
+        
+        self.driver.find_element(By.CSS_SELECTOR, result_selector).click()
+        if not self._wait_for("chat_open", self._chat_header_matches):
+            print(f"⚠️ Chat header did not show {Config.WHATSAPP_GROUP_NAME}, continuing anyway")
+        print(f"✅ Opened {Config.WHATSAPP_GROUP_NAME} group via search")
+        return True
+    
+    def _click_group(self):
+        """Look the group up in the chat list and open it"""
         try:
             # Look for the group name in the chat list
             group_element = self.driver.find_element(
@@ -83,14 +302,17 @@ class WhatsAppSender:
             )
             clickable_parent.click()
             print(f"✅ Found and clicked {Config.WHATSAPP_GROUP_NAME} group")
-            time.sleep(2)
+            
+            # Wait until the conversation header shows the group
+            if not self._wait_for("chat_open", self._chat_header_matches):
+                print(f"⚠️ Chat header did not show {Config.WHATSAPP_GROUP_NAME}, continuing anyway")
             return True
         except:
             print(f"❌ Could not find {Config.WHATSAPP_GROUP_NAME} group in chat list")
             return False
     
-    def _send_message(self, clean_text, link):
-        """Send the actual message"""
+    def _send_message(self, text, link):
+        """Send the actual message. Returns True once it shows a sent tick"""
         try:
             # Find message input using a more general approach
             message_box = self.driver.find_element(
@@ -99,58 +321,154 @@ class WhatsAppSender:
             
             # Click to focus
             message_box.click()
-            time.sleep(1)
+            self._wait_for("focus", lambda driver: driver.switch_to.active_element == message_box)
             
             # Clear any existing content
             message_box.clear()
-            time.sleep(0.5)
             
-            # Send as one continuous line with pipe separator
-            single_line_message = f"{Config.MESSAGE_PREFIX}{clean_text} | {link}"
+            # Tweet text followed by the link after a pipe separator
+            message = f"{Config.MESSAGE_PREFIX}{self._format_text(text)} | {link}"
             
-            # Type the entire message at once
-            message_box.send_keys(single_line_message)
+            with metrics.timer("typing", method=Config.WHATSAPP_COMPOSE_METHOD):
+                self._compose(message_box, message)
             
             # Add space for preview
             message_box.send_keys(" ")
             
             # Wait for link preview
             print("⏳ Waiting for link preview to load...")
-            time.sleep(5)
+            if not self._wait_for("link_preview", self._any_present(LINK_PREVIEW_SELECTORS)):
+                print("⚠️ Link preview did not appear, sending without it")
             
             # Send the message
             message_box.send_keys(Keys.ENTER)
             
-            print(f"✅ Tweet sent to {Config.WHATSAPP_GROUP_NAME} group!")
-            time.sleep(2)
-            
+            if self._wait_for("sent", self._message_sent(link)):
+                print(f"✅ Tweet sent to {Config.WHATSAPP_GROUP_NAME} group!")
+                return True
+            print(f"⚠️ Message submitted to {Config.WHATSAPP_GROUP_NAME} but no sent tick seen yet")
+            return False
+        
         except Exception as e:
             print(f"❌ Could not send message: {str(e)}")
             # Try alternative approach
-            self._send_message_alternative(clean_text, link)
+            return self._send_message_alternative(self._clean_text_for_chrome(text), link)
     
     def _send_message_alternative(self, clean_text, link):
         """Alternative method to send message"""
         try:
             message_box = self.driver.find_element(By.CSS_SELECTOR, "div[contenteditable='true']")
             message_box.click()
-            time.sleep(1)
+            self._wait_for("focus", lambda driver: driver.switch_to.active_element == message_box)
             
-            # Type header with tweet content
-            message_box.send_keys(f"{Config.MESSAGE_PREFIX}{clean_text}")
-            # Use Shift+Enter for line breaks
-            message_box.send_keys(Keys.SHIFT + Keys.ENTER)
-            message_box.send_keys(Keys.SHIFT + Keys.ENTER)
-            # Type URL and space
-            message_box.send_keys(link)
-            message_box.send_keys(" ")
+            with metrics.timer("typing", method="alternative"):
+                # Type header with tweet content
+                message_box.send_keys(f"{Config.MESSAGE_PREFIX}{clean_text}")
+                # Use Shift+Enter for line breaks
+                message_box.send_keys(Keys.SHIFT + Keys.ENTER)
+                message_box.send_keys(Keys.SHIFT + Keys.ENTER)
+                # Type URL and space
+                message_box.send_keys(link)
+                message_box.send_keys(" ")
             print("⏳ Waiting for link preview to load...")
-            time.sleep(5)  # Wait longer for preview
+            self._wait_for("link_preview", self._any_present(LINK_PREVIEW_SELECTORS))
             message_box.send_keys(Keys.ENTER)  # Send message
             
+            if not self._wait_for("sent", self._message_sent(link)):
+                print("⚠️ Message submitted via alternative method but no sent tick seen yet")
+                return False
             print(f"✅ Tweet sent via alternative method!")
+            return True
         except:
             print("❌ All message sending methods failed")
+            return False
+    
+    def _compose(self, message_box, message):
+        """Fill the compose box with the message, pasting it in one step unless typing is configured"""
+        if Config.WHATSAPP_COMPOSE_METHOD == "paste":
+            composed = self.driver.execute_script(PASTE_TEXT_SCRIPT, message_box, message) or ""
+            # WhatsApp renders emoji as images, so only the closing link is compared
+            if message.split()[-1] in composed:
+                return
+            print("⚠️ Pasting into the message box failed, typing instead")
+            metrics.inc("compose_fallbacks_total")
+            message_box.clear()
+        
+        # ChromeDriver types one key event per character and cannot type emoji
+        for index, line in enumerate(message.split("\n")):
+            if index:
+                message_box.send_keys(Keys.SHIFT + Keys.ENTER)
+            message_box.send_keys(self._clean_text_for_chrome(line))
+    
+    def _wait_for(self, step, condition):
+        """Wait for a readiness condition, recording how long it took. Returns False on timeout"""
+        timeout = Config.WHATSAPP_WAIT_TIMEOUTS.get(step, 10)
+        started = time.monotonic()
+        
+        try:
+            WebDriverWait(
+                self.driver, timeout, poll_frequency=0.1,
+                ignored_exceptions=(StaleElementReferenceException,)
+            ).until(condition)
+            ready = True
+        except TimeoutException:
+            print(f"⚠️ Timed out after {timeout}s waiting for {step}")
+            metrics.inc("whatsapp_wait_timeouts_total", step=step)
+            ready = False
+        
+        elapsed = time.monotonic() - started
+        self.wait_timings[step].append(elapsed)
+        metrics.observe("whatsapp_wait_seconds", elapsed, step=step)
+        return ready
+    
+    def _any_present(self, selectors):
+        """Condition that passes once any of the selectors matches"""
+        def condition(driver):
+            return any(driver.find_elements(By.CSS_SELECTOR, selector) for selector in selectors)
+        return condition
+    
+    def _chat_header_matches(self, driver):
+        """Check that the open conversation is the configured group"""
+        return driver.execute_script(OPEN_CHAT_TITLE_SCRIPT) == Config.WHATSAPP_GROUP_NAME
+    
+    def _already_in_chat(self, link):
+        """Check whether one of our recent messages in the open chat carries the tweet link"""
+        status_id = link.rstrip('/').split('/')[-1]
+        texts = self.driver.execute_script(RECENT_OUTGOING_SCRIPT, OUTGOING_MESSAGE_SELECTOR, RECENT_OUTGOING_COUNT)
+        return any(status_id in text for text in texts or [])
+    
+    def _message_sent(self, link):
+        """Condition that passes once the newest outgoing bubble holds the link and a sent/delivered tick"""
+        status_id = link.rstrip('/').split('/')[-1] if link else ''
+        
+        def condition(driver):
+            bubbles = driver.find_elements(By.CSS_SELECTOR, OUTGOING_MESSAGE_SELECTOR)
+            if not bubbles or status_id not in bubbles[-1].text:
+                return False
+            return any(bubbles[-1].find_elements(By.CSS_SELECTOR, selector) for selector in SENT_TICK_SELECTORS)
+        return condition
+    
+    def _print_wait_timings(self):
+        """Print the latest and average duration of each readiness wait"""
+        summary = ", ".join(
+            f"{step} {timings[-1]:.1f}s (avg {sum(timings) / len(timings):.1f}s)"
+            for step, timings in self.wait_timings.items() if timings
+        )
+        if summary:
+            print(f"⏱️ WhatsApp waits: {summary}")
+    
+    def _format_text(self, text, single_line=False):
+        """Tidy tweet text for pasting, keeping emoji, accents and (unless single_line) line breaks"""
+        # Fix the Twitter copy-paste formatting issue
+        text = re.sub(r'\n\s*@', ' @', text)
+        text = re.sub(r'@(\w+)\s*\n', r'@\1 ', text)
+        
+        if single_line:
+            return re.sub(r'\s+', ' ', text).strip()
+        
+        text = re.sub(r'[ \t]+\n', '\n', text)
+        text = re.sub(r'\n{3,}', '\n\n', text)
+        return re.sub(r'[ \t]+', ' ', text).strip()
     
     def _clean_text_for_chrome(self, text):
         """Clean text to remove characters that ChromeDriver can't handle"""